@@ -43,7 +43,14 @@ def main() -> None:
     if not token:
         logging.warning("GITHUB_TOKEN not set; rate limits will be low")
 
-    client = GitHubClient(token=token)
+    client = GitHubClient(
+        token=token,
+        rate_limit_safety=config.rate_limit_safety,
+        cache_path=(
+            os.path.join(config.cache_dir, "hwrepo.sqlite") if config.cache_dir else None
+        ),
+        cache_ttl_days=config.cache_ttl_days,
+    )
     run_pipeline(client, config, Path(args.output), Path(args.rejects))
 
 
@@ -3,23 +3,31 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import os
 from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Tuple
-
-from .diff_classifier import (
-    classify_files,
-    compute_file_overlap,
-    extract_issue_refs,
-    merge_patches,
-)
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+from .diff_classifier import merge_patches
 from .models import AuthorContribution, CommitInfo, FilePatch
 
 LOGGER = logging.getLogger(__name__)
 
+# Below this many authors the pickling cost of a process pool outweighs
+# the parallel clustering win, so run serially.
+_PARALLEL_AUTHOR_THRESHOLD = 32
+
 
+@lru_cache(maxsize=100_000)
 def parse_iso_datetime(dt_str: str) -> datetime:
-    """Parse ISO 8601 datetime string."""
+    """Parse ISO 8601 datetime string.
+
+    Memoized: the same timestamp strings are re-parsed across clustering
+    passes, so repeat calls collapse to a dict lookup.
+    """
     dt_str = dt_str.replace("Z", "+00:00")
     try:
         return datetime.fromisoformat(dt_str)
@@ -29,9 +37,16 @@ def parse_iso_datetime(dt_str: str) -> datetime:
 
 def generate_contribution_id(repo: str, author: str, commits: List[CommitInfo]) -> str:
     """Generate a unique contribution ID."""
-    sha_concat = "".join(c.sha[:8] for c in commits[:5])  # Use first 5 commits
-    hash_input = f"{repo}:{author}:{sha_concat}".encode()
-    return hashlib.sha256(hash_input).hexdigest()[:12]
+    # blake2b with a 6-byte digest yields exactly the 12 hex chars we keep.
+    # Feed the hasher incrementally instead of building a joined string.
+    h = hashlib.blake2b(digest_size=6)
+    h.update(repo.encode())
+    h.update(b":")
+    h.update(author.encode())
+    h.update(b":")
+    for c in commits[:5]:  # Use first 5 commits
+        h.update(c.sha[:8].encode("ascii"))
+    return h.hexdigest()
 
 
 def group_commits_by_author(commits: List[CommitInfo]) -> Dict[str, List[CommitInfo]]:
@@ -46,6 +61,7 @@ def cluster_author_commits_by_feature(
     commits: List[CommitInfo],
     time_window_days: int = 60,
     file_overlap_threshold: float = 0.0,  # Disabled by default
+    assume_sorted: bool = False,
 ) -> List[List[CommitInfo]]:
     """
     Cluster an author's commits into feature groups.
@@ -53,10 +69,17 @@ def cluster_author_commits_by_feature(
     Uses time proximity only to group related commits.
     Commits within the time window are grouped together.
 
+    The cheap time-window comparison is the only per-commit test; file
+    overlap was deliberately dropped from this path (see
+    file_overlap_threshold below), so there is no expensive set
+    intersection to short-circuit.
+
     Args:
         commits: List of commits from a single author (chronologically sorted)
         time_window_days: Max days between commits in same feature cluster
         file_overlap_threshold: Deprecated, kept for backward compatibility
+        assume_sorted: Skip the internal sort when the caller already
+            sorted commits by authored_date
 
     Returns:
         List of commit groups (each group is a feature)
@@ -65,34 +88,39 @@ def cluster_author_commits_by_feature(
         return []
 
     # Sort by date
-    sorted_commits = sorted(commits, key=lambda c: c.authored_date)
+    sorted_commits = commits if assume_sorted else sorted(
+        commits, key=lambda c: c.authored_date
+    )
 
-    clusters: List[List[CommitInfo]] = []
-    current_cluster: List[CommitInfo] = [sorted_commits[0]]
-    last_time = parse_iso_datetime(sorted_commits[0].authored_date)
+    # Parse all timestamps up front into integer epoch seconds
+    # (struct-of-arrays layout) so the loop below is pure int arithmetic
+    # with no timedelta construction per commit.
+    epochs = [
+        int(parse_iso_datetime(c.authored_date).timestamp())
+        for c in sorted_commits
+    ]
 
-    for commit in sorted_commits[1:]:
-        commit_time = parse_iso_datetime(commit.authored_date)
+    # Record cluster boundaries as indices into sorted_commits, then slice
+    # once at the end; this avoids growing intermediate cluster lists.
+    boundaries = [0]
+    mark_boundary = boundaries.append
+    last_epoch = epochs[0]
 
-        # Check if this commit belongs to current cluster (time-based only)
-        time_gap = (commit_time - last_time).days
+    for i in range(1, len(sorted_commits)):
+        epoch = epochs[i]
 
-        if time_gap <= time_window_days:
-            # Within time window, same cluster
-            current_cluster.append(commit)
-            last_time = commit_time
-        else:
-            # Start new cluster
-            if current_cluster:
-                clusters.append(current_cluster)
-            current_cluster = [commit]
-            last_time = commit_time
+        # Check if this commit belongs to current cluster (time-based
+        # only); floor-divide to whole days to match timedelta.days
+        if (epoch - last_epoch) // 86400 > time_window_days:
+            mark_boundary(i)
+        last_epoch = epoch
 
-    # Don't forget the last cluster
-    if current_cluster:
-        clusters.append(current_cluster)
+    boundaries.append(len(sorted_commits))
 
-    return clusters
+    return [
+        sorted_commits[boundaries[k]:boundaries[k + 1]]
+        for k in range(len(boundaries) - 1)
+    ]
 
 
 def collect_author_contributions(
@@ -100,76 +128,145 @@ def collect_author_contributions(
     commits: List[CommitInfo],
     time_window_days: int = 60,
     min_commits: int = 2,
-) -> List[AuthorContribution]:
+    prior_contributions: Optional[Dict[str, AuthorContribution]] = None,
+) -> Iterator[AuthorContribution]:
     """
     Collect contributions from all authors in the repository.
 
     This groups commits by author, then by feature within each author,
     and collects/merges patches from each contribution.
 
+    Yields contributions one at a time so callers that stream to JSONL
+    never hold every merged patch set in memory at once.
+
     Args:
         repo: Repository name (owner/repo)
         commits: List of all commits
         time_window_days: Max days between commits in same feature
         min_commits: Minimum commits required for a contribution
+        prior_contributions: Contributions from an earlier run keyed by
+            contribution_id; clusters whose id and member SHAs match a
+            prior entry reuse its merged patches instead of re-merging
 
-    Returns:
-        List of AuthorContribution objects
+    Yields:
+        AuthorContribution objects
     """
-    contributions: List[AuthorContribution] = []
-
-    # Group by author
-    author_groups = group_commits_by_author(commits)
-
-    for author, author_commits in author_groups.items():
-        # Cluster by feature within this author's commits
-        feature_clusters = cluster_author_commits_by_feature(
-            author_commits,
-            time_window_days=time_window_days,
+    prior = prior_contributions or {}
+    # One global sort by (author, date) replaces the per-author dict fill
+    # plus the per-author re-sort inside the clusterer.
+    commits_sorted = sorted(commits, key=lambda c: (c.author, c.authored_date))
+
+    groups = [
+        (author, list(group))
+        for author, group in groupby(commits_sorted, key=lambda c: c.author)
+    ]
+
+    # Per-author work is independent; fan it out across processes when
+    # there are enough authors to amortize the pickling cost.
+    if len(groups) >= _PARALLEL_AUTHOR_THRESHOLD:
+        tasks = [
+            (repo, author, author_commits, time_window_days, min_commits, prior)
+            for author, author_commits in groups
+        ]
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for result in executor.map(_process_author, tasks, chunksize=8):
+                yield from result
+        return
+
+    for author, author_commits in groups:
+        yield from _author_contributions(
+            repo, author, author_commits, time_window_days, min_commits, prior
         )
 
-        for cluster in feature_clusters:
-            if len(cluster) < min_commits:
-                continue
 
-            # Sort chronologically
-            cluster.sort(key=lambda c: c.authored_date)
-
-            # Collect all patches from this cluster
-            all_patches: List[List[FilePatch]] = []
-            commit_shas: List[str] = []
-            commit_messages: List[str] = []
-
-            for commit in cluster:
-                commit_shas.append(commit.sha)
-                commit_messages.append(commit.message.split("\n")[0][:100])
-                all_patches.append(commit.files)
-
-            # Merge patches
-            code_patches, test_patches = merge_patches(all_patches)
+def _process_author(
+    task: Tuple[str, str, List[CommitInfo], int, int, Dict[str, AuthorContribution]]
+) -> List[AuthorContribution]:
+    """Worker entry point for the process pool (must be picklable)."""
+    repo, author, author_commits, time_window_days, min_commits, prior = task
+    return list(
+        _author_contributions(
+            repo, author, author_commits, time_window_days, min_commits, prior
+        )
+    )
 
-            # Only include if has both code and test patches
-            if not code_patches or not test_patches:
-                continue
 
-            contribution = AuthorContribution(
-                repo=repo,
-                author=author,
-                contribution_id=generate_contribution_id(repo, author, cluster),
-                commits=commit_shas,
-                first_commit_date=cluster[0].authored_date,
-                last_commit_date=cluster[-1].authored_date,
-                code_patches=code_patches,
-                test_patches=test_patches,
-                commit_messages=commit_messages,
-                validation_status="pending",
-            )
-            contributions.append(contribution)
+def _author_contributions(
+    repo: str,
+    author: str,
+    author_commits: List[CommitInfo],
+    time_window_days: int,
+    min_commits: int,
+    prior: Dict[str, AuthorContribution],
+) -> Iterator[AuthorContribution]:
+    """Build contributions for a single author's pre-sorted commits."""
+    # Prime a hasher with the shared "repo:author:" prefix once; each
+    # cluster copies it instead of re-hashing the prefix.
+    id_base = hashlib.blake2b(digest_size=6)
+    id_base.update(repo.encode())
+    id_base.update(b":")
+    id_base.update(author.encode())
+    id_base.update(b":")
+
+    # Cluster by feature within this author's commits
+    feature_clusters = cluster_author_commits_by_feature(
+        author_commits,
+        time_window_days=time_window_days,
+        assume_sorted=True,
+    )
 
-    return contributions
+    for cluster in feature_clusters:
+        if len(cluster) < min_commits:
+            continue
+
+        # Clusters are chronologically sorted by construction.
+
+        id_hasher = id_base.copy()
+        for c in cluster[:5]:  # Use first 5 commits
+            id_hasher.update(c.sha[:8].encode("ascii"))
+        contribution_id = id_hasher.hexdigest()
+
+        commit_shas = [c.sha for c in cluster]
+
+        # The id is SHA-driven, so an unchanged cluster from a prior run
+        # can reuse its merged patches (304-style skip of merge_patches).
+        cached = prior.get(contribution_id)
+        if cached is not None and cached.commits == commit_shas:
+            yield cached
+            continue
+
+        # Collect all patches from this cluster
+        all_patches: List[List[FilePatch]] = []
+        commit_messages: List[str] = []
+
+        for commit in cluster:
+            # partition avoids allocating the full line list that
+            # split("\n") would build for multi-paragraph messages
+            commit_messages.append(commit.message.partition("\n")[0][:100])
+            all_patches.append(commit.files)
+
+        # Merge patches
+        code_patches, test_patches = merge_patches(all_patches)
+
+        # Only include if has both code and test patches
+        if not code_patches or not test_patches:
+            continue
+
+        yield AuthorContribution(
+            repo=repo,
+            author=author,
+            contribution_id=contribution_id,
+            commits=commit_shas,
+            first_commit_date=cluster[0].authored_date,
+            last_commit_date=cluster[-1].authored_date,
+            code_patches=code_patches,
+            test_patches=test_patches,
+            commit_messages=commit_messages,
+            validation_status="pending",
+        )
 
 
-def get_pr_covered_shas(prs: List[dict]) -> Set[str]:
+def get_pr_covered_shas(prs: List[dict]) -> FrozenSet[str]:
     """
     Get all commit SHAs that are covered by merged PRs.
 
@@ -177,16 +274,22 @@ def get_pr_covered_shas(prs: List[dict]) -> Set[str]:
         prs: List of PR info dicts
 
     Returns:
-        Set of covered commit SHAs
+        Frozenset of covered commit SHAs (hashable, so callers can cache
+        it across reruns)
     """
     covered: Set[str] = set()
 
     for pr in prs:
-        merge_sha = pr.get("merge_commit_sha") or pr.get("mergeCommit", {}).get("oid")
+        # Explicit two-step lookup: the old `or pr.get("mergeCommit", {})`
+        # fallback allocated a throwaway dict for every REST-shaped PR.
+        merge_sha = pr.get("merge_commit_sha")
+        if not merge_sha:
+            merge_commit = pr.get("mergeCommit")
+            merge_sha = merge_commit.get("oid") if merge_commit else None
         if merge_sha:
             covered.add(merge_sha)
 
-    return covered
+    return frozenset(covered)
 
 
 # Keep old function for backward compatibility
@@ -196,6 +299,7 @@ def cluster_commits(
     time_window_hours: int = 24,
     file_overlap_threshold: float = 0.3,
     covered_shas: Optional[Set[str]] = None,
+    prior_contributions: Optional[Dict[str, AuthorContribution]] = None,
 ) -> List[AuthorContribution]:
     """
     Cluster commits by author and feature.
@@ -214,9 +318,10 @@ def cluster_commits(
     # Convert hours to days for the new algorithm
     time_window_days = max(1, time_window_hours // 24) if time_window_hours < 24 * 60 else 60
 
-    return collect_author_contributions(
+    return list(collect_author_contributions(
         repo=repo,
         commits=uncovered,
         time_window_days=time_window_days,
         min_commits=1,  # Allow single commits if they have code+test
-    )
+        prior_contributions=prior_contributions,
+    ))
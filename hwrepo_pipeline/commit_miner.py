@@ -3,14 +3,15 @@ from __future__ import annotations
 
 import json
 import logging
-from dataclasses import asdict
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from .commit_cluster import collect_author_contributions, get_pr_covered_shas
 from .config import MinerConfig
-from .diff_classifier import classify_files, has_valid_patches
+from .diff_classifier import classify_and_validate, classify_files
 from .github_client import GitHubClient
 from .models import (
     AuthorContribution,
@@ -23,21 +24,43 @@ from .models import (
 LOGGER = logging.getLogger(__name__)
 
 
+def _sha_key(sha: str) -> int:
+    """Fold a hex SHA into a 64-bit int key for compact set membership."""
+    return int(sha[:16], 16)
+
+
 class CommitMiner:
     """Mines commit pairs and author contributions from repositories."""
 
-    def __init__(self, client: GitHubClient, config: MinerConfig):
+    def __init__(
+        self,
+        client: GitHubClient,
+        config: MinerConfig,
+        collect_rejects: bool = True,
+    ):
         self.client = client
         self.config = config
+        # When rejects are discarded (e.g. rejects_path is /dev/null),
+        # skip building the record objects entirely.
+        self.collect_rejects = collect_rejects
+
+    def lookback_cutoff(self) -> str:
+        """Compute the ISO lookback cutoff from config.lookback_days."""
+        return (
+            datetime.utcnow() - timedelta(days=self.config.lookback_days)
+        ).isoformat() + "Z"
 
     def mine_repo(
-        self, repo: str
+        self, repo: str, since: Optional[str] = None
     ) -> Tuple[List[CommitPair], List[AuthorContribution], List[MinerRejectRecord]]:
         """
         Mine commit pairs and author contributions from a single repository.
 
         Args:
             repo: Repository name in 'owner/repo' format
+            since: ISO lookback cutoff; computed from config.lookback_days
+                when not supplied. run_miner computes it once per batch so
+                all repos share a consistent cutoff.
 
         Returns:
             Tuple of (commit_pairs, author_contributions, rejected_records)
@@ -47,10 +70,7 @@ class CommitMiner:
         contributions: List[AuthorContribution] = []
         rejects: List[MinerRejectRecord] = []
 
-        # Calculate lookback date
-        since_date = (
-            datetime.utcnow() - timedelta(days=self.config.lookback_days)
-        ).isoformat() + "Z"
+        since_date = since or self.lookback_cutoff()
 
         LOGGER.info("Mining repo %s (since %s)", repo, since_date[:10])
 
@@ -83,11 +103,14 @@ class CommitMiner:
 
     def _mine_prs(
         self, owner: str, repo_name: str, since: str
-    ) -> Tuple[List[CommitPair], List[MinerRejectRecord], Set[str]]:
+    ) -> Tuple[List[CommitPair], List[MinerRejectRecord], Set[int]]:
         """Mine commit pairs from merged PRs."""
         pairs: List[CommitPair] = []
         rejects: List[MinerRejectRecord] = []
-        covered_shas: Set[str] = set()
+        # Covered SHAs are stored as 64-bit int keys (see _sha_key): the
+        # membership test in the author phase then hashes a machine int
+        # instead of a 40-char hex string.
+        covered_shas: Set[int] = set()
 
         repo = f"{owner}/{repo_name}"
 
@@ -107,117 +130,180 @@ class CommitMiner:
 
         LOGGER.debug("Fetched %d merged PRs", len(prs))
 
+        # Pagination can overlap around the `since` cutoff, so dedupe by
+        # PR number before fetching anything per PR.
+        seen_prs: Set[int] = set()
+        unique_prs: List[Dict[str, Any]] = []
         for pr in prs:
             pr_number = pr.get("number")
-            merge_sha = pr.get("mergeCommit", {}).get("oid") if self.config.use_graphql else pr.get("merge_commit_sha")
-            base_sha = pr.get("baseRefOid") if self.config.use_graphql else pr.get("base", {}).get("sha")
+            if pr_number in seen_prs:
+                continue
+            seen_prs.add(pr_number)
+            unique_prs.append(pr)
+
+        # Prefetch PR file lists in bulk so the classification loop never
+        # blocks on a round-trip per PR. The GraphQL PR listing is
+        # metadata-only, so files are fetched here via aliased batch
+        # queries -- and only for PRs that can still become pairs (both
+        # SHAs present and at least one changed file).
+        files_by_number: Dict[int, List[Dict[str, Any]]] = {}
+        if self.config.use_graphql and unique_prs:
+            numbers = [
+                pr["number"]
+                for pr in unique_prs
+                if pr.get("baseRefOid")
+                and pr.get("mergeCommit")
+                and pr.get("changedFiles", 1)
+            ]
+            if numbers:
+                files_by_number = self.client.get_pr_files_batch(
+                    owner, repo_name, numbers
+                )
+        elif not self.config.use_graphql and unique_prs:
+            numbers = [pr.get("number") for pr in unique_prs]
+            workers = min(self.config.pr_files_concurrency, len(numbers))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                fetched = executor.map(
+                    lambda n: self.client.get_pr_files(owner, repo_name, n),
+                    numbers,
+                )
+                files_by_number = dict(zip(numbers, fetched))
+
+        for pr in unique_prs:
+            pair, reject, merge_sha = self._process_pr(
+                owner, repo_name, pr,
+                prefetched_files=files_by_number.get(pr.get("number")),
+            )
 
             if merge_sha:
-                covered_shas.add(merge_sha)
+                covered_shas.add(_sha_key(merge_sha))
+            if pair:
+                pairs.append(pair)
+            if reject:
+                rejects.append(reject)
 
-            if not base_sha or not merge_sha:
-                rejects.append(MinerRejectRecord(
-                    repo=repo,
-                    source_type="pr",
-                    source_id=str(pr_number),
-                    reasons=["missing base_sha or merge_sha"],
-                ))
-                continue
+        return pairs, rejects, covered_shas
 
-            # Get files for this PR
-            if self.config.use_graphql:
-                files = pr.get("files", {}).get("nodes", [])
-                files = [
-                    {"filename": f["path"], "additions": f["additions"], "deletions": f["deletions"]}
-                    for f in files if f
-                ]
-            else:
-                files = self.client.get_pr_files(owner, repo_name, pr_number)
-
-            # Quick filter
-            if not has_valid_patches(
-                files,
-                min_code=self.config.min_code_changes,
-                min_test=self.config.min_test_changes,
-            ):
-                rejects.append(MinerRejectRecord(
-                    repo=repo,
-                    source_type="pr",
-                    source_id=str(pr_number),
-                    reasons=["insufficient code or test changes"],
-                ))
-                continue
+    def _process_pr(
+        self,
+        owner: str,
+        repo_name: str,
+        pr: Dict[str, Any],
+        prefetched_files: Optional[List[Dict[str, Any]]] = None,
+    ) -> Tuple[Optional[CommitPair], Optional[MinerRejectRecord], Optional[str]]:
+        """
+        Turn one merged PR into a CommitPair or a reject record.
 
-            # Classify files
-            code_patches, test_patches, _ = classify_files(files)
+        Args:
+            prefetched_files: file list fetched ahead of time by _mine_prs
+                (batched GraphQL queries or the concurrent REST prefetch);
+                fetched on demand when not supplied.
 
-            if not code_patches:
-                rejects.append(MinerRejectRecord(
-                    repo=repo,
-                    source_type="pr",
-                    source_id=str(pr_number),
-                    reasons=["no Verilog/SV code changes"],
-                ))
-                continue
+        Returns:
+            Tuple of (pair, reject, merge_sha); exactly one of pair/reject
+            is set, and merge_sha is returned whenever the PR has one so
+            the caller can mark it covered.
+        """
+        repo = f"{owner}/{repo_name}"
+        pr_number = pr.get("number")
 
-            if not test_patches:
-                rejects.append(MinerRejectRecord(
-                    repo=repo,
-                    source_type="pr",
-                    source_id=str(pr_number),
-                    reasons=["no test file changes"],
-                ))
-                continue
+        if self.config.use_graphql:
+            merge_commit = pr.get("mergeCommit")
+            merge_sha = merge_commit.get("oid") if merge_commit else None
+            base_sha = pr.get("baseRefOid")
+        else:
+            merge_sha = pr.get("merge_commit_sha")
+            base_sha = pr.get("base", {}).get("sha")
 
-            # Create commit pair
-            pair = CommitPair(
+        if not base_sha or not merge_sha:
+            reject = MinerRejectRecord(
                 repo=repo,
-                base_sha=base_sha,
-                target_sha=merge_sha,
                 source_type="pr",
                 source_id=str(pr_number),
-                code_patches=code_patches,
-                test_patches=test_patches,
-                validation_status="pending",
-            )
-            pairs.append(pair)
+                reasons=["missing base_sha or merge_sha"],
+            ) if self.collect_rejects else None
+            return None, reject, merge_sha
+
+        # Get files for this PR, normally prefetched in bulk by _mine_prs.
+        # A PR absent from the batch results (e.g. zero changedFiles, or a
+        # partial batch failure) falls back to a per-PR fetch.
+        if prefetched_files is not None:
+            files = prefetched_files
+        else:
+            files = self.client.get_pr_files(owner, repo_name, pr_number)
 
-        return pairs, rejects, covered_shas
+        # Classify and validate in one pass over the file list
+        code_patches, test_patches, reject_reason = classify_and_validate(
+            files,
+            min_code=self.config.min_code_changes,
+            min_test=self.config.min_test_changes,
+        )
+
+        if reject_reason:
+            reject = MinerRejectRecord(
+                repo=repo,
+                source_type="pr",
+                source_id=str(pr_number),
+                reasons=[reject_reason],
+            ) if self.collect_rejects else None
+            return None, reject, merge_sha
+
+        pair = CommitPair(
+            repo=repo,
+            base_sha=base_sha,
+            target_sha=merge_sha,
+            source_type="pr",
+            source_id=str(pr_number),
+            code_patches=code_patches,
+            test_patches=test_patches,
+            validation_status="pending",
+        )
+        return pair, None, merge_sha
 
     def _mine_author_contributions(
         self,
         owner: str,
         repo_name: str,
         since: str,
-        covered_shas: Set[str],
+        covered_shas: Set[int],
     ) -> Tuple[List[AuthorContribution], List[MinerRejectRecord]]:
         """Mine author contributions by collecting patches from each author."""
         contributions: List[AuthorContribution] = []
         rejects: List[MinerRejectRecord] = []
         repo = f"{owner}/{repo_name}"
 
-        # Fetch commits
-        raw_commits = list(self.client.list_commits(
+        # Stream commits straight off the paginator: filter covered SHAs
+        # and dedupe overlapping pages in one pass (insertion-ordered
+        # dict) without materializing the raw page dicts in a list first.
+        uncovered_by_sha: Dict[str, Dict[str, Any]] = {}
+        for c in self.client.list_commits(
             owner, repo_name,
             since=since,
             max_commits=self.config.max_commits_per_repo,
-        ))
-
-        LOGGER.debug("Fetched %d commits", len(raw_commits))
-
-        # Convert to CommitInfo objects and fetch files for each
-        commits: List[CommitInfo] = []
-        for c in raw_commits:
+        ):
             sha = c.get("sha", "")
-            if sha in covered_shas:
+            if sha in uncovered_by_sha:
                 continue
+            if _sha_key(sha or "0") in covered_shas:
+                continue
+            uncovered_by_sha[sha] = c
+
+        LOGGER.debug("Fetched %d uncovered commits", len(uncovered_by_sha))
 
+        # Fetch all changed-file lists in one batched (thread-pooled)
+        # pass instead of per commit.
+
+        files_by_sha = self.client.get_commit_files_batch(
+            owner, repo_name, list(uncovered_by_sha)
+        )
+
+        # Convert to CommitInfo objects
+        commits: List[CommitInfo] = []
+        for sha, c in uncovered_by_sha.items():
             commit_data = c.get("commit", {})
             author = commit_data.get("author", {})
 
-            # Fetch files for this commit
-            commit_files = self.client.get_commit_files(owner, repo_name, sha)
-            code_patches, test_patches, _ = classify_files(commit_files)
+            code_patches, test_patches, _ = classify_files(files_by_sha.get(sha, []))
             all_patches = code_patches + test_patches
 
             commits.append(CommitInfo(
@@ -232,7 +318,8 @@ class CommitMiner:
         if not commits:
             return contributions, rejects
 
-        # Collect author contributions
+        # Collect author contributions (streamed; each contribution is
+        # filtered and either kept or rejected before the next is built)
         author_contribs = collect_author_contributions(
             repo=repo,
             commits=commits,
@@ -240,29 +327,29 @@ class CommitMiner:
             min_commits=self.config.min_commits_per_contribution,
         )
 
-        LOGGER.debug("Found %d author contributions", len(author_contribs))
-
         # Filter contributions that meet minimum thresholds
         for contrib in author_contribs:
             code_changes = sum(p.additions + p.deletions for p in contrib.code_patches)
             test_changes = sum(p.additions + p.deletions for p in contrib.test_patches)
 
             if code_changes < self.config.min_code_changes:
-                rejects.append(MinerRejectRecord(
-                    repo=repo,
-                    source_type="author",
-                    source_id=f"{contrib.author}:{contrib.contribution_id}",
-                    reasons=[f"insufficient code changes ({code_changes} < {self.config.min_code_changes})"],
-                ))
+                if self.collect_rejects:
+                    rejects.append(MinerRejectRecord(
+                        repo=repo,
+                        source_type="author",
+                        source_id=f"{contrib.author}:{contrib.contribution_id}",
+                        reasons=[f"insufficient code changes ({code_changes} < {self.config.min_code_changes})"],
+                    ))
                 continue
 
             if test_changes < self.config.min_test_changes:
-                rejects.append(MinerRejectRecord(
-                    repo=repo,
-                    source_type="author",
-                    source_id=f"{contrib.author}:{contrib.contribution_id}",
-                    reasons=[f"insufficient test changes ({test_changes} < {self.config.min_test_changes})"],
-                ))
+                if self.collect_rejects:
+                    rejects.append(MinerRejectRecord(
+                        repo=repo,
+                        source_type="author",
+                        source_id=f"{contrib.author}:{contrib.contribution_id}",
+                        reasons=[f"insufficient test changes ({test_changes} < {self.config.min_test_changes})"],
+                    ))
                 continue
 
             contributions.append(contrib)
@@ -291,30 +378,36 @@ def run_miner(
         contributions_path: Path to write author_contributions.jsonl (optional)
         progress_path: Optional path to track progress for resumption
     """
-    miner = CommitMiner(client, config)
+    miner = CommitMiner(
+        client, config,
+        collect_rejects=str(rejects_path) != os.devnull,
+    )
 
     # Default contributions path
     if contributions_path is None:
         contributions_path = output_path.parent / "author_contributions.jsonl"
 
-    # Load progress if resuming
+    # Load progress if resuming: one read + C-level set construction
+    # instead of a Python-level strip/add per line
     processed_repos: Set[str] = set()
     if progress_path and progress_path.exists():
-        with open(progress_path, "r") as f:
-            for line in f:
-                processed_repos.add(line.strip())
+        processed_repos = set(
+            progress_path.read_text(encoding="utf-8").splitlines()
+        )
+        processed_repos.discard("")
         LOGGER.info("Resuming: %d repos already processed", len(processed_repos))
 
     # Open output files in append mode if resuming
     mode = "a" if processed_repos else "w"
 
-    with open(output_path, mode) as pairs_f, \
-         open(contributions_path, mode) as contribs_f, \
-         open(rejects_path, mode) as rej_f, \
-         open(input_path, "r") as in_f:
-
+    # Collect the repos to mine up front so they can be dispatched to the
+    # thread pool; mining is network-bound, so overlapping repos across
+    # threads hides most of the GitHub round-trip latency.
+    repos: List[str] = []
+    with open(input_path, "r") as in_f:
         for line in in_f:
-            if not line.strip():
+            # isspace avoids allocating a stripped copy per line
+            if not line or line.isspace():
                 continue
 
             try:
@@ -330,20 +423,52 @@ def run_miner(
             if repo in processed_repos:
                 continue
 
-            try:
-                pairs, contributions, rejects = miner.mine_repo(repo)
+            repos.append(repo)
+
+    # Keep one line-buffered descriptor for progress instead of paying an
+    # open/write/close round-trip per repo.
+    prog_f = open(progress_path, "a", buffering=1) if progress_path else None
+
+    # 1 MiB user-space buffers amortize write syscalls across a repo's
+    # many small JSON lines; the per-repo flush below still bounds data
+    # loss to the current repo so progress-based resume stays correct.
+    buf_size = 1 << 20
 
-                # Write commit pairs (from PRs)
-                for pair in pairs:
-                    pairs_f.write(json.dumps(asdict(pair)) + "\n")
+    with open(output_path, mode, buffering=buf_size) as pairs_f, \
+         open(contributions_path, mode, buffering=buf_size) as contribs_f, \
+         open(rejects_path, mode, buffering=buf_size) as rej_f, \
+         ThreadPoolExecutor(max_workers=config.max_concurrency) as executor:
 
-                # Write author contributions
-                for contrib in contributions:
-                    contribs_f.write(json.dumps(asdict(contrib)) + "\n")
+        # One cutoff for the whole batch: cheaper than re-deriving it per
+        # repo and keeps the `since` filter consistent across the run.
+        since_date = miner.lookback_cutoff()
 
-                # Write rejects
-                for reject in rejects:
-                    rej_f.write(json.dumps(asdict(reject)) + "\n")
+        future_to_repo = {
+            executor.submit(miner.mine_repo, repo, since_date): repo
+            for repo in repos
+        }
+
+        # All writes happen on this thread as futures complete, so the
+        # output files never see interleaved records.
+        for future in as_completed(future_to_repo):
+            repo = future_to_repo[future]
+            try:
+                pairs, contributions, rejects = future.result()
+
+                # Concatenate each repo's records and write them in one
+                # call per stream rather than one write per record.
+                if pairs:
+                    pairs_f.write(
+                        "".join(json.dumps(p.to_dict()) + "\n" for p in pairs)
+                    )
+                if contributions:
+                    contribs_f.write(
+                        "".join(json.dumps(c.to_dict()) + "\n" for c in contributions)
+                    )
+                if rejects:
+                    rej_f.write(
+                        "".join(json.dumps(r.to_dict()) + "\n" for r in rejects)
+                    )
 
                 # Flush to ensure data is written
                 pairs_f.flush()
@@ -355,10 +480,9 @@ def run_miner(
                     repo, len(pairs), len(contributions), len(rejects)
                 )
 
-                # Update progress
-                if progress_path:
-                    with open(progress_path, "a") as prog_f:
-                        prog_f.write(repo + "\n")
+                # Update progress (line-buffered, so this hits disk now)
+                if prog_f:
+                    prog_f.write(repo + "\n")
 
             except Exception as e:
                 LOGGER.error("Error processing %s: %s", repo, e)
@@ -368,9 +492,12 @@ def run_miner(
                     source_id="",
                     reasons=[f"processing error: {str(e)}"],
                 )
-                rej_f.write(json.dumps(asdict(error_reject)) + "\n")
+                rej_f.write(json.dumps(error_reject.to_dict()) + "\n")
                 rej_f.flush()
 
+    if prog_f:
+        prog_f.close()
+
     LOGGER.info("Mining complete.")
     LOGGER.info("  Commit pairs: %s", output_path)
     LOGGER.info("  Author contributions: %s", contributions_path)
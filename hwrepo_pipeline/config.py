@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 from typing import List
 
+from .scanner import compile_allowlist, compile_denylist
+
 
 @dataclass
 class PipelineConfig:
@@ -75,25 +77,70 @@ class PipelineConfig:
     scan_workflows: bool = True
     scan_scripts_dir: bool = True
     max_script_files: int = 20
+    # Cap on bytes scanned per file; oversized manifests are truncated
+    # rather than held and scanned in full
+    max_scan_bytes: int = 1_000_000
 
     use_graphql: bool = True
 
+    # Repos evaluated concurrently (network-bound thread pool)
+    max_workers: int = 16
+
+    # Return a reject as soon as a stage fails instead of collecting every
+    # reason; rejected records then list only the first failing stage
+    fast_reject: bool = True
+
+    # Rate-limit headroom left unspent per token before the client pauses
+    # for the reset instead of running into a 403
+    rate_limit_safety: int = 0
+
+    # Directory for the persistent ETag response cache ("" disables it);
+    # entries older than cache_ttl_days are purged on startup
+    cache_dir: str = ""
+    cache_ttl_days: int = 30
+
     verilog_extensions: List[str] = field(
         default_factory=lambda: [".v", ".vh", ".sv", ".svh"]
     )
 
+    def __post_init__(self) -> None:
+        self.refresh_derived()
+
+    def refresh_derived(self) -> None:
+        """Rebuild precomputed lookups after term/extension fields change.
+
+        Hot paths use these instead of re-lowercasing or re-scanning the
+        list fields: frozensets give O(1) membership and the suffix tuple
+        feeds a single str.endswith call.
+        """
+        self.allowlist_lower = frozenset(t.lower() for t in self.allowlist_terms)
+        self.denylist_lower = frozenset(t.lower() for t in self.denylist_terms)
+        self.verilog_suffixes = tuple(self.verilog_extensions)
+        self.allowlist_re = compile_allowlist(self.allowlist_terms)
+        self.denylist_re = compile_denylist(self.denylist_terms)
+
+
+# Declared field names, computed once so load_config does set membership
+# instead of a hasattr/MRO walk per key. This also keeps JSON input from
+# overriding the derived lookup attributes.
+_PIPELINE_FIELDS = frozenset(f.name for f in fields(PipelineConfig))
+
 
 def load_config(path: str | Path | None) -> PipelineConfig:
     if path is None:
         return PipelineConfig()
 
-    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    # json.loads accepts bytes directly; skip the str decode round-trip
+    data = json.loads(Path(path).read_bytes())
     config = PipelineConfig()
 
     for key, value in data.items():
-        if hasattr(config, key):
+        if key in _PIPELINE_FIELDS:
             setattr(config, key, value)
 
+    # Field overrides bypass __post_init__, so rebuild the derived lookups
+    config.refresh_derived()
+
     return config
 
 
@@ -128,17 +175,35 @@ class MinerConfig:
     # API options
     use_graphql: bool = True
 
+    # Number of repos mined concurrently (network-bound thread pool)
+    max_concurrency: int = 8
+
+    # Concurrent PR file fetches on the REST path (use_graphql=False)
+    pr_files_concurrency: int = 16
+
+    # Rate-limit headroom left unspent per token before the client pauses
+    # for the reset instead of running into a 403
+    rate_limit_safety: int = 0
+
+    # Directory for the persistent ETag response cache ("" disables it);
+    # entries older than cache_ttl_days are purged on startup
+    cache_dir: str = ""
+    cache_ttl_days: int = 30
+
+
+_MINER_FIELDS = frozenset(f.name for f in fields(MinerConfig))
+
 
 def load_miner_config(path: str | Path | None) -> MinerConfig:
     """Load miner configuration from JSON file."""
     if path is None:
         return MinerConfig()
 
-    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    data = json.loads(Path(path).read_bytes())
     config = MinerConfig()
 
     for key, value in data.items():
-        if hasattr(config, key):
+        if key in _MINER_FIELDS:
             setattr(config, key, value)
 
     return config
@@ -1,16 +1,18 @@
 """File classification for Verilog/SystemVerilog code and tests."""
 from __future__ import annotations
 
-import fnmatch
 import re
-from pathlib import PurePosixPath
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from .models import FilePatch
 
 # Verilog/SystemVerilog source extensions
 VERILOG_EXTENSIONS = {".v", ".vh", ".sv", ".svh"}
 
+# Tuple form for the C-level str.endswith fast path in is_verilog_file
+_VERILOG_SUFFIXES = (".v", ".vh", ".sv", ".svh")
+
 # Test file patterns (filename-based)
 # Focus on explicit testbench naming conventions
 TEST_FILE_PATTERNS = [
@@ -29,62 +31,101 @@ TEST_FILE_PATTERNS = [
 # Test directory patterns
 # NOTE: Excluded 'sim', 'simulation' - these often contain simulation
 # platform/infrastructure code, not actual testbenches
-TEST_DIR_PATTERNS = [
-    "tb",
-    "test",
-    "tests",
-    "testbench",
-    "testbenches",
-    "verif",
-    "verification",
-    "bench",
-    "dv",           # design verification
-    "uvm",          # UVM testbenches
-    "cocotb",       # cocotb tests
-]
+TEST_DIR_PATTERNS = frozenset(
+    [
+        "tb",
+        "test",
+        "tests",
+        "testbench",
+        "testbenches",
+        "verif",
+        "verification",
+        "bench",
+        "dv",           # design verification
+        "uvm",          # UVM testbenches
+        "cocotb",       # cocotb tests
+    ]
+)
 
+# The substring checks backing is_test_file, fused into one alternation
+# compiled at import time so each path is scanned in a single pass instead
+# of up to eight `in` probes.
+_TEST_PATH_RE = re.compile(r"test|/tb/|/tb_|_tb/|_tb\.|/verif/|/dv/|/uvm/")
 
+
+@lru_cache(maxsize=65536)
 def is_verilog_file(path: str) -> bool:
     """Check if a file is a Verilog/SystemVerilog source file."""
-    suffix = PurePosixPath(path).suffix.lower()
-    return suffix in VERILOG_EXTENSIONS
+    path_lower = path.lower()
+    if not path_lower.endswith(_VERILOG_SUFFIXES):
+        return False
+    # Match pathlib suffix semantics: a bare dotfile like ".sv" has no suffix
+    name = path_lower[path_lower.rfind("/") + 1:]
+    return name not in _VERILOG_SUFFIXES
 
 
+@lru_cache(maxsize=65536)
 def is_test_file(path: str) -> bool:
     """Check if a file is a test file based on path containing 'test' or 'tb'."""
-    path_lower = path.lower()
-
-    # Simple rule: path contains 'test' or 'tb'
-    if 'test' in path_lower or '/tb/' in path_lower or '/tb_' in path_lower or '_tb/' in path_lower or '_tb.' in path_lower:
-        return True
-
-    # Also check for common verification directories
-    if '/verif/' in path_lower or '/dv/' in path_lower or '/uvm/' in path_lower:
-        return True
-
-    return False
+    # Same rule as before ('test' or a tb/verif/dv/uvm marker anywhere in
+    # the path), matched by the precompiled alternation above.
+    return _TEST_PATH_RE.search(path.lower()) is not None
 
 
+@lru_cache(maxsize=65536)
 def classify_file(path: str) -> str:
     """
     Classify a file as 'code', 'test', or 'other'.
 
+    Memoized on the raw path string: the same testbench and source paths
+    recur across commits and PRs, so repeats become dict lookups.
+
     Returns:
         'test' - Any file in test/tb path (any file type)
         'code' - Verilog/SV source file (non-test)
         'other' - Non-Verilog, non-test file
     """
+    # Inlined is_test_file / is_verilog_file so the path is lowercased once
+    # and a miss costs one regex scan plus one tuple endswith.
+    path_lower = path.lower()
+
     # First check if it's a test file (any file type)
-    if is_test_file(path):
+    if _TEST_PATH_RE.search(path_lower) is not None:
         return "test"
 
-    # Then check if it's Verilog code
-    if is_verilog_file(path):
-        return "code"
+    # Then check if it's Verilog code (bare dotfiles like ".sv" excluded,
+    # matching is_verilog_file)
+    if path_lower.endswith(_VERILOG_SUFFIXES):
+        name = path_lower[path_lower.rfind("/") + 1:]
+        if name not in _VERILOG_SUFFIXES:
+            return "code"
 
     return "other"
 
 
+def iter_classified(files: Iterable[dict]) -> Iterator[Tuple[str, FilePatch]]:
+    """
+    Classify file dicts from the GitHub API in one streaming pass.
+
+    Yields (patch_type, FilePatch) pairs; the single dict->FilePatch
+    conversion point shared by classify_files, has_valid_patches, and
+    classify_and_validate, so consumers bucket or short-circuit without
+    classifying the same path twice.
+    """
+    for f in files:
+        get = f.get
+        path = get("filename") or get("path", "")
+        patch_type = classify_file(path)
+
+        yield patch_type, FilePatch(
+            path=path,
+            patch_type=patch_type,
+            additions=get("additions", 0),
+            deletions=get("deletions", 0),
+            patch=get("patch"),
+        )
+
+
 def classify_files(
     files: List[dict],
 ) -> Tuple[List[FilePatch], List[FilePatch], List[FilePatch]]:
@@ -102,24 +143,19 @@ def classify_files(
     test_patches: List[FilePatch] = []
     other_patches: List[FilePatch] = []
 
-    for f in files:
-        path = f.get("filename") or f.get("path", "")
-        patch_type = classify_file(path)
-
-        fp = FilePatch(
-            path=path,
-            patch_type=patch_type,
-            additions=f.get("additions", 0),
-            deletions=f.get("deletions", 0),
-            patch=f.get("patch"),
-        )
+    # Bind the appends once; saves an attribute lookup per file in the
+    # eager bucketing loop
+    code_append = code_patches.append
+    test_append = test_patches.append
+    other_append = other_patches.append
 
+    for patch_type, fp in iter_classified(files):
         if patch_type == "code":
-            code_patches.append(fp)
+            code_append(fp)
         elif patch_type == "test":
-            test_patches.append(fp)
+            test_append(fp)
         else:
-            other_patches.append(fp)
+            other_append(fp)
 
     return code_patches, test_patches, other_patches
 
@@ -134,14 +170,11 @@ def has_valid_patches(files: List[dict], min_code: int = 1, min_test: int = 1) -
     code_count = 0
     test_count = 0
 
-    for f in files:
-        path = f.get("filename") or f.get("path", "")
-        patch_type = classify_file(path)
-
+    for patch_type, fp in iter_classified(files):
         if patch_type == "code":
-            code_count += f.get("additions", 0) + f.get("deletions", 0)
+            code_count += fp.additions + fp.deletions
         elif patch_type == "test":
-            test_count += f.get("additions", 0) + f.get("deletions", 0)
+            test_count += fp.additions + fp.deletions
 
         # Early exit if both thresholds are met
         if code_count >= min_code and test_count >= min_test:
@@ -150,10 +183,75 @@ def has_valid_patches(files: List[dict], min_code: int = 1, min_test: int = 1) -
     return code_count >= min_code and test_count >= min_test
 
 
+# All issue-reference patterns fused into one alternation, compiled once at
+# import time; a single finditer pass replaces four findall passes per message.
+# Exactly one named group matches per hit, so m.lastgroup selects the capture.
+_ISSUE_REF_RE = re.compile(
+    r"(?:fixes|closes|resolves|fix|close|resolve)\s+"
+    r"(?:(?P<full>\w+/\w+#\d+)|#(?P<kw>\d+))"
+    r"|(?<![\w/])#(?P<plain>\d+)"
+    r"|GH-(?P<gh>\d+)",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=50_000)
+def _extract_issue_refs_cached(message: str) -> Tuple[str, ...]:
+    return tuple({m.group(m.lastgroup) for m in _ISSUE_REF_RE.finditer(message)})
+
+
+def classify_and_validate(
+    files: Iterable[dict], min_code: int = 1, min_test: int = 1
+) -> Tuple[List[FilePatch], List[FilePatch], Optional[str]]:
+    """
+    Classify files and validate change thresholds in a single pass.
+
+    Fuses has_valid_patches and classify_files so each path is classified
+    once and the file list is traversed once. Files classified as 'other'
+    are not retained.
+
+    Args:
+        files: Iterable of file dicts from GitHub API
+        min_code: Minimum code additions+deletions required
+        min_test: Minimum test additions+deletions required
+
+    Returns:
+        Tuple of (code_patches, test_patches, reject_reason); the reason
+        is None when the change passes all thresholds.
+    """
+    code_patches: List[FilePatch] = []
+    test_patches: List[FilePatch] = []
+    code_count = 0
+    test_count = 0
+
+    for patch_type, fp in iter_classified(files):
+        if patch_type == "other":
+            continue
+
+        if patch_type == "code":
+            code_patches.append(fp)
+            code_count += fp.additions + fp.deletions
+        else:
+            test_patches.append(fp)
+            test_count += fp.additions + fp.deletions
+
+    if code_count < min_code or test_count < min_test:
+        return code_patches, test_patches, "insufficient code or test changes"
+    if not code_patches:
+        return code_patches, test_patches, "no Verilog/SV code changes"
+    if not test_patches:
+        return code_patches, test_patches, "no test file changes"
+
+    return code_patches, test_patches, None
+
+
 def extract_issue_refs(message: str) -> List[str]:
     """
     Extract issue references from a commit message.
 
+    Results are memoized per message so repeated passes over the same
+    commits skip the regex work.
+
     Patterns matched:
     - #123
     - fixes #123
@@ -162,37 +260,41 @@ def extract_issue_refs(message: str) -> List[str]:
     - GH-123
     - owner/repo#123
     """
-    refs: List[str] = []
-
-    # Match various issue reference patterns
-    patterns = [
-        r"(?:fixes|closes|resolves|fix|close|resolve)\s+#(\d+)",
-        r"(?:fixes|closes|resolves|fix|close|resolve)\s+(\w+/\w+#\d+)",
-        r"(?<![\w/])#(\d+)",
-        r"GH-(\d+)",
-    ]
+    return list(_extract_issue_refs_cached(message))
 
-    for pattern in patterns:
-        matches = re.findall(pattern, message, re.IGNORECASE)
-        refs.extend(matches)
 
-    return list(set(refs))
+def compute_file_overlap(
+    files1: Iterable[str], files2: Iterable[str], threshold: float = 0.0
+) -> float:
+    """
+    Compute the overlap (Jaccard) ratio between two file collections.
 
+    Accepts any iterable; sets and frozensets are used as-is so callers
+    holding path sets don't pay a list-copy plus re-set round-trip. The
+    union size is derived arithmetically from the intersection, so only
+    one temporary set is built per call.
 
-def compute_file_overlap(files1: List[str], files2: List[str]) -> float:
-    """
-    Compute the overlap ratio between two file lists.
+    Args:
+        threshold: if > 0, pairs whose Jaccard ratio provably cannot reach
+            it (upper bound min/max of the set sizes) return 0.0 without
+            computing the intersection, letting O(N^2) clustering loops
+            prune cheap.
 
     Returns a value between 0 and 1.
     """
-    if not files1 or not files2:
+    set1 = files1 if isinstance(files1, (set, frozenset)) else set(files1)
+    set2 = files2 if isinstance(files2, (set, frozenset)) else set(files2)
+
+    len1 = len(set1)
+    len2 = len(set2)
+    if not len1 or not len2:
         return 0.0
 
-    set1 = set(files1)
-    set2 = set(files2)
+    if threshold > 0.0 and min(len1, len2) < threshold * max(len1, len2):
+        return 0.0
 
     intersection = len(set1 & set2)
-    union = len(set1 | set2)
+    union = len1 + len2 - intersection
 
     return intersection / union if union > 0 else 0.0
 
@@ -210,36 +312,37 @@ def merge_patches(patches_list: List[List[FilePatch]]) -> Tuple[List[FilePatch],
     Returns:
         Tuple of (merged_code_patches, merged_test_patches)
     """
-    # Track latest patch for each file path
-    code_by_path: dict[str, FilePatch] = {}
-    test_by_path: dict[str, FilePatch] = {}
+    # Accumulate [additions, deletions, latest_patch] per path and build the
+    # merged FilePatch objects once at the end, instead of reallocating a
+    # FilePatch on every collision. The inputs stay untouched since they may
+    # be shared with CommitInfo.files.
+    code_by_path: dict[str, list] = {}
+    test_by_path: dict[str, list] = {}
 
     for patches in patches_list:
         for patch in patches:
             if patch.patch_type == "code":
-                if patch.path in code_by_path:
-                    # Merge: accumulate additions/deletions, keep latest patch content
-                    existing = code_by_path[patch.path]
-                    code_by_path[patch.path] = FilePatch(
-                        path=patch.path,
-                        patch_type="code",
-                        additions=existing.additions + patch.additions,
-                        deletions=existing.deletions + patch.deletions,
-                        patch=patch.patch,  # keep latest
-                    )
-                else:
-                    code_by_path[patch.path] = patch
+                by_path = code_by_path
             elif patch.patch_type == "test":
-                if patch.path in test_by_path:
-                    existing = test_by_path[patch.path]
-                    test_by_path[patch.path] = FilePatch(
-                        path=patch.path,
-                        patch_type="test",
-                        additions=existing.additions + patch.additions,
-                        deletions=existing.deletions + patch.deletions,
-                        patch=patch.patch,
-                    )
-                else:
-                    test_by_path[patch.path] = patch
-
-    return list(code_by_path.values()), list(test_by_path.values())
+                by_path = test_by_path
+            else:
+                continue
+
+            entry = by_path.get(patch.path)
+            if entry is None:
+                by_path[patch.path] = [patch.additions, patch.deletions, patch.patch]
+            else:
+                entry[0] += patch.additions
+                entry[1] += patch.deletions
+                entry[2] = patch.patch  # keep latest
+
+    return (
+        [
+            FilePatch(path=path, patch_type="code", additions=adds, deletions=dels, patch=content)
+            for path, (adds, dels, content) in code_by_path.items()
+        ],
+        [
+            FilePatch(path=path, patch_type="test", additions=adds, deletions=dels, patch=content)
+            for path, (adds, dels, content) in test_by_path.items()
+        ],
+    )
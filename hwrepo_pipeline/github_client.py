@@ -1,39 +1,345 @@
 from __future__ import annotations
 
-import base64
+import binascii
+import codecs
+import json
 import logging
+import os
+import random
+import re
+import sqlite3
+import threading
 import time
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import requests
 
 LOGGER = logging.getLogger(__name__)
 
 
+_MISSING = object()
+
+
+def _parse_json(resp: requests.Response) -> Any:
+    """Parse a response body once, memoizing the decoded form on the
+    response object so ETag-cache hits don't re-run the JSON parser."""
+    parsed = getattr(resp, "_parsed_json", _MISSING)
+    if parsed is _MISSING:
+        parsed = resp.json()
+        resp._parsed_json = parsed
+    return parsed
+
+
+def _retry_after_seconds(value: str) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+# Built once at import time instead of per list_merged_prs_graphql call.
+# Metadata-only (changedFiles/additions/deletions counts rather than inlined
+# file lists) to keep the response small and the node budget low enough for
+# 100 PRs per page; callers fetch file lists lazily via get_pr_files_batch.
+_PR_LIST_QUERY = """
+query MergedPRs($owner: String!, $repo: String!, $cursor: String) {
+    repository(owner: $owner, name: $repo) {
+        pullRequests(
+            first: 100,
+            after: $cursor,
+            states: [MERGED],
+            orderBy: {field: UPDATED_AT, direction: DESC}
+        ) {
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            nodes {
+                number
+                title
+                updatedAt
+                mergedAt
+                baseRefOid
+                mergeCommit {
+                    oid
+                }
+                author {
+                    login
+                }
+                changedFiles
+                additions
+                deletions
+            }
+        }
+    }
+}
+"""
+
+
+def _next_link(headers: Dict[str, str]) -> Optional[str]:
+    """Extract the rel=\"next\" URL from a Link header, if any."""
+    link = headers.get("Link")
+    if not link:
+        return None
+    for entry in requests.utils.parse_header_links(link):
+        if entry.get("rel") == "next":
+            return entry.get("url")
+    return None
+
+
 class GitHubClient:
-    def __init__(self, token: Optional[str] = None, base_url: str = "https://api.github.com"):
+    # Backoff for transient failures: min(cap, base * 2**attempt) with jitter
+    BACKOFF_BASE = 1.0
+    BACKOFF_CAP = 60.0
+
+    def __init__(
+        self,
+        token: Union[str, List[str], None] = None,
+        base_url: str = "https://api.github.com",
+        max_retries: int = 5,
+        rate_limit_safety: int = 0,
+        cache_path: Optional[str] = None,
+        cache_ttl_days: int = 0,
+        sleep=time.sleep,
+    ):
         self.base_url = base_url.rstrip("/")
-        self.session = requests.Session()
-        self.session.headers.update({"Accept": "application/vnd.github+json"})
+        self.max_retries = max_retries
+        # Headroom kept unspent on each token: proactive pacing kicks in
+        # when the tracked remaining budget drops to this value instead of
+        # riding the limit all the way to a 403.
+        self.rate_limit_safety = rate_limit_safety
+        # Injected so tests and callers can avoid real sleeps
+        self._sleep = sleep
+
+        # Token pool: each token gets its own Session (clean Authorization
+        # header and connection pool); request() picks the token with the
+        # most rate-limit budget left, so N tokens multiply throughput with
+        # no caller changes.
+        tokens: List[Optional[str]]
+        if isinstance(token, (list, tuple)):
+            tokens = [t for t in token if t] or [None]
+        else:
+            tokens = [token]
+        self._token_pool = [
+            {"session": self._make_session(tok), "remaining": float("inf"), "reset": 0.0}
+            for tok in tokens
+        ]
+        self.session = self._token_pool[0]["session"]
+        # Commit data is immutable for the duration of a run, so compare
+        # results can be cached per (owner, repo, base, head) for the
+        # lifetime of this client.
+        self._compare_cache: Dict[Tuple[str, str, str, str], Optional[Dict[str, Any]]] = {}
+        # ETag conditional-request cache: (url, params) -> (etag, response).
+        # GitHub answers matching If-None-Match with a bodyless 304 that does
+        # not count against the primary rate limit, so re-runs revalidate
+        # instead of re-downloading.
+        self._etag_cache: Dict[Tuple[str, str], Tuple[str, requests.Response]] = {}
+        # Negative cache of content paths that 404ed, so repeated probes of
+        # the same missing README/Makefile skip the network round-trip.
+        self._missing_contents: set = set()
+        # Commits are immutable, so single-commit lookups never need the
+        # ETag revalidation round-trip once fetched.
+        self._commit_cache: Dict[Tuple[str, str, str], Optional[Dict[str, Any]]] = {}
+        # Optional sqlite-backed ETag store so conditional requests survive
+        # process restarts: a daily re-run revalidates yesterday's bodies
+        # with free 304s instead of re-downloading them.
+        self._cache_lock = threading.Lock()
+        self._cache_conn: Optional[sqlite3.Connection] = None
+        if cache_path:
+            self._cache_conn = self._open_cache(cache_path, cache_ttl_days)
+        # Unauthenticated session for raw.githubusercontent.com: that host
+        # has its own generous limit outside the API quota and ignores
+        # Authorization, so file bodies ride on a separate connection pool.
+        self._raw_session = self._make_session(None)
+
+    @staticmethod
+    def _make_session(token: Optional[str]) -> requests.Session:
+        session = requests.Session()
+        # The miner and pipeline drive this client from thread pools; widen
+        # the per-host connection pool so concurrent workers reuse keep-alive
+        # sockets instead of opening and discarding extras (urllib3 keeps
+        # only 10 per host by default).
+        adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=32)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Accept": "application/vnd.github+json"})
         if token:
-            self.session.headers.update({"Authorization": f"Bearer {token}"})
+            session.headers.update({"Authorization": f"Bearer {token}"})
+        return session
+
+    @staticmethod
+    def _open_cache(path: str, ttl_days: int) -> sqlite3.Connection:
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        # check_same_thread=False: the client is driven from thread pools;
+        # all access goes through _cache_lock.
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS etag_cache ("
+            "key TEXT PRIMARY KEY, etag TEXT NOT NULL, body BLOB NOT NULL, "
+            "headers TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        if ttl_days:
+            conn.execute(
+                "DELETE FROM etag_cache WHERE updated_at < ?",
+                (time.time() - ttl_days * 86400,),
+            )
+        conn.commit()
+        return conn
+
+    def _load_cached(
+        self, cache_key: Tuple[str, str]
+    ) -> Optional[Tuple[str, requests.Response]]:
+        """Rehydrate a (etag, response) pair from the on-disk store."""
+        with self._cache_lock:
+            row = self._cache_conn.execute(
+                "SELECT etag, body, headers FROM etag_cache WHERE key = ?",
+                ("\x00".join(cache_key),),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, body, headers = row
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = body
+        resp.headers = requests.structures.CaseInsensitiveDict(json.loads(headers))
+        resp.url = cache_key[0]
+        return etag, resp
+
+    def _store_cached(
+        self, cache_key: Tuple[str, str], etag: str, resp: requests.Response
+    ) -> None:
+        with self._cache_lock:
+            self._cache_conn.execute(
+                "INSERT OR REPLACE INTO etag_cache VALUES (?, ?, ?, ?, ?)",
+                (
+                    "\x00".join(cache_key),
+                    etag,
+                    resp.content,
+                    json.dumps(dict(resp.headers)),
+                    time.time(),
+                ),
+            )
+            self._cache_conn.commit()
+
+    def _pick_token(self) -> Dict[str, Any]:
+        """Select the token entry with the most rate-limit budget left."""
+        if len(self._token_pool) == 1:
+            return self._token_pool[0]
+        now = time.time()
+        for entry in self._token_pool:
+            if entry["remaining"] <= self.rate_limit_safety and now >= entry["reset"]:
+                entry["remaining"] = float("inf")
+        return max(self._token_pool, key=lambda entry: entry["remaining"])
 
     def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
-        resp = self.session.request(method, url, **kwargs)
-        if resp.status_code == 403 and resp.headers.get("X-RateLimit-Remaining") == "0":
-            reset = int(resp.headers.get("X-RateLimit-Reset", "0"))
-            sleep_for = max(0, reset - int(time.time()))
-            LOGGER.warning("rate limit hit; sleeping for %ss", sleep_for)
-            time.sleep(sleep_for)
-            resp = self.session.request(method, url, **kwargs)
+        cache_key = None
+        if method == "GET":
+            params = kwargs.get("params")
+            cache_key = (url, json.dumps(params, sort_keys=True) if params else "")
+            cached = self._etag_cache.get(cache_key)
+            if cached is None and self._cache_conn is not None:
+                cached = self._load_cached(cache_key)
+                if cached is not None:
+                    self._etag_cache[cache_key] = cached
+            if cached is not None:
+                kwargs.setdefault("headers", {}).setdefault("If-None-Match", cached[0])
+
+        resp: Optional[requests.Response] = None
+        for attempt in range(self.max_retries + 1):
+            entry = self._pick_token()
+            # Proactive pacing: when even the best token is down to the
+            # safety margin (learned from earlier response headers), wait
+            # out its reset (jittered against stampedes) instead of
+            # burning the request on a 403.
+            if entry["remaining"] <= self.rate_limit_safety:
+                wait = entry["reset"] - time.time()
+                if wait > 0:
+                    wait += random.uniform(0, 2)
+                    LOGGER.warning(
+                        "rate limit exhausted; pausing %.0fs before request", wait
+                    )
+                    self._sleep(wait)
+                entry["remaining"] = float("inf")
+            try:
+                resp = entry["session"].request(method, url, **kwargs)
+            except requests.ConnectionError:
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep(self._backoff(attempt))
+                continue
+
+            remaining = resp.headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                entry["remaining"] = int(remaining)
+                entry["reset"] = float(resp.headers.get("X-RateLimit-Reset", 0))
+
+            if resp.status_code in (403, 429) and attempt < self.max_retries:
+                if resp.headers.get("X-RateLimit-Remaining") == "0":
+                    # Primary rate limit: wait for the reset, plus jitter so
+                    # concurrent workers don't stampede the same instant.
+                    reset = int(resp.headers.get("X-RateLimit-Reset", "0"))
+                    sleep_for = max(0, reset - int(time.time())) + random.uniform(0, 2)
+                    LOGGER.warning("rate limit hit; sleeping for %.0fs", sleep_for)
+                    self._sleep(sleep_for)
+                    continue
+                # Secondary/abuse rate limit: Retry-After may be seconds or
+                # an HTTP-date. A plain 403 without rate-limit markers is a
+                # real permissions error and must not be retried.
+                wait = _retry_after_seconds(resp.headers.get("Retry-After", ""))
+                if wait is None and (
+                    resp.status_code == 429
+                    or "secondary rate" in resp.text
+                    or "abuse" in resp.text
+                ):
+                    wait = self._backoff(attempt)
+                if wait is not None:
+                    LOGGER.warning("secondary rate limit; sleeping for %.0fs", wait)
+                    self._sleep(wait)
+                    continue
+
+            if resp.status_code >= 500 and attempt < self.max_retries:
+                self._sleep(self._backoff(attempt))
+                continue
+
+            break
+
+        if cache_key is not None and resp is not None:
+            if resp.status_code == 304:
+                cached = self._etag_cache.get(cache_key)
+                if cached is not None:
+                    return cached[1]
+            elif resp.status_code == 200:
+                etag = resp.headers.get("ETag")
+                if etag:
+                    self._etag_cache[cache_key] = (etag, resp)
+                    if self._cache_conn is not None:
+                        self._store_cached(cache_key, etag, resp)
         return resp
 
+    def _backoff(self, attempt: int) -> float:
+        return min(self.BACKOFF_CAP, self.BACKOFF_BASE * 2 ** attempt) * (
+            0.5 + random.random()
+        )
+
     def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, str]]:
         url = f"{self.base_url}{path}"
         resp = self.request("GET", url, params=params)
         if resp.status_code >= 400:
-            raise requests.HTTPError(f"{resp.status_code}: {resp.text}")
-        return resp.json(), resp.headers
+            # reason, not text: error bodies are discarded anyway, so don't
+            # pay the content decode just to build the exception message.
+            raise requests.HTTPError(f"{resp.status_code}: {resp.reason}")
+        return _parse_json(resp), resp.headers
 
     def get_json_or_none(
         self, path: str, params: Optional[Dict[str, Any]] = None
@@ -43,15 +349,15 @@ class GitHubClient:
         if resp.status_code == 404:
             return None, resp.headers
         if resp.status_code >= 400:
-            raise requests.HTTPError(f"{resp.status_code}: {resp.text}")
-        return resp.json(), resp.headers
+            raise requests.HTTPError(f"{resp.status_code}: {resp.reason}")
+        return _parse_json(resp), resp.headers
 
     def post_graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.base_url}/graphql"
         resp = self.request("POST", url, json={"query": query, "variables": variables})
         if resp.status_code >= 400:
             raise requests.HTTPError(f"{resp.status_code}: {resp.text}")
-        payload = resp.json()
+        payload = _parse_json(resp)
         if "errors" in payload:
             raise requests.HTTPError(f"GraphQL error: {payload['errors']}")
         return payload["data"]
@@ -64,52 +370,130 @@ class GitHubClient:
         max_results: int,
         per_page: int = 100,
     ) -> Iterable[Dict[str, Any]]:
+        # Follow the Link rel="next" cursor GitHub supplies instead of
+        # counting pages and probing for a short tail page.
         collected = 0
-        page = 1
-        while collected < max_results:
-            params = {
-                "q": query,
-                "sort": sort,
-                "order": order,
-                "per_page": per_page,
-                "page": page,
-            }
-            data, _ = self.get_json("/search/repositories", params=params)
-            items = data.get("items", [])
+        url = f"{self.base_url}/search/repositories"
+        params: Optional[Dict[str, Any]] = {
+            "q": query,
+            "sort": sort,
+            "order": order,
+            "per_page": per_page,
+        }
+        while collected < max_results and url:
+            resp = self.request("GET", url, params=params)
+            if resp.status_code >= 400:
+                raise requests.HTTPError(f"{resp.status_code}: {resp.text}")
+            items = _parse_json(resp).get("items", [])
             if not items:
                 break
             for item in items:
                 yield item
                 collected += 1
                 if collected >= max_results:
-                    break
-            if len(items) < per_page:
-                break
-            page += 1
+                    return
+            # rel="next" URLs already carry the query string
+            url = _next_link(resp.headers)
+            params = None
 
     def list_contents(
         self, owner: str, repo: str, path: str, ref: Optional[str] = None
     ) -> Optional[Any]:
+        key = f"{owner}/{repo}@{ref or ''}:{path}"
+        if key in self._missing_contents:
+            return None
         params = {"ref": ref} if ref else None
         data, _ = self.get_json_or_none(
             f"/repos/{owner}/{repo}/contents/{path}", params=params
         )
+        if data is None:
+            self._missing_contents.add(key)
         return data
 
+    @staticmethod
+    def _stream_text(resp: requests.Response) -> str:
+        """Decode a streamed response body incrementally as UTF-8 so large
+        files are never double-buffered."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        parts = [
+            decoder.decode(chunk)
+            for chunk in resp.iter_content(chunk_size=65536)
+        ]
+        parts.append(decoder.decode(b"", final=True))
+        return "".join(parts)
+
+    def iter_file_bytes(
+        self,
+        owner: str,
+        repo: str,
+        path: str,
+        ref: Optional[str] = None,
+        chunk_size: int = 65536,
+    ) -> Iterator[bytes]:
+        """Yield a file's raw bytes in chunks from the raw host.
+
+        Callers that stop early (close the generator) abort the transfer,
+        so threshold scans over large files only download what they read.
+        Falls back to get_file_text -- one whole-body chunk -- when the raw
+        host can't serve the path.
+        """
+        raw_url = (
+            f"https://raw.githubusercontent.com/{owner}/{repo}/{ref or 'HEAD'}/{path}"
+        )
+        try:
+            resp = self._raw_session.get(raw_url, stream=True)
+        except requests.ConnectionError:
+            resp = None
+        if resp is not None and resp.status_code == 200:
+            try:
+                yield from resp.iter_content(chunk_size=chunk_size)
+            finally:
+                resp.close()
+            return
+
+        text = self._file_text_via_contents(owner, repo, path, ref=ref)
+        if text is not None:
+            yield text.encode("utf-8")
+
     def get_file_text(
         self, owner: str, repo: str, path: str, ref: Optional[str] = None
     ) -> Optional[str]:
+        # Try raw.githubusercontent.com first: the body arrives as plain
+        # bytes (no 33% base64 inflation) and the fetch doesn't count
+        # against the API rate limit at all.
+        raw_url = (
+            f"https://raw.githubusercontent.com/{owner}/{repo}/{ref or 'HEAD'}/{path}"
+        )
+        try:
+            resp = self._raw_session.get(raw_url, stream=True)
+        except requests.ConnectionError:
+            resp = None
+        if resp is not None and resp.status_code == 200:
+            return self._stream_text(resp)
+
+        return self._file_text_via_contents(owner, repo, path, ref=ref)
+
+    def _file_text_via_contents(
+        self, owner: str, repo: str, path: str, ref: Optional[str] = None
+    ) -> Optional[str]:
+        """Contents-API fallback (covers refs the raw host rejects and
+        keeps behavior when raw is unreachable)."""
         data = self.list_contents(owner, repo, path, ref=ref)
         if not data or data.get("type") != "file":
             return None
         if "content" in data and data.get("encoding") == "base64":
-            decoded = base64.b64decode(data["content"])
+            # a2b_base64 skips the newlines GitHub inserts, so feed it the
+            # ASCII bytes directly instead of going through the b64decode
+            # wrapper's extra validation pass.
+            decoded = binascii.a2b_base64(data["content"].encode("ascii"))
             return decoded.decode("utf-8", errors="replace")
         if data.get("download_url"):
-            resp = self.request("GET", data["download_url"])
+            # Raw downloads bypass the API client plumbing (no rate-limit
+            # headers on this host).
+            resp = self.session.get(data["download_url"], stream=True)
             if resp.status_code >= 400:
                 return None
-            return resp.text
+            return self._stream_text(resp)
         return None
 
     def get_languages(self, owner: str, repo: str) -> Dict[str, int]:
@@ -124,6 +508,79 @@ class GitHubClient:
             return None
         return data.get("tree", [])
 
+    def batch_repo_metadata(
+        self,
+        owner_repos: List[Tuple[str, str]],
+        batch_size: int = 50,
+        history_since: Optional[Dict[str, str]] = None,
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Fetch filtering metadata for many repos in few GraphQL round-trips.
+
+        Uses one repository alias per repo so the per-repo REST probes for
+        languages, PR/issue totals, release/tag counts, CI/scripts
+        listings, and commit-history counts collapse into
+        ceil(N/batch_size) requests.
+
+        Args:
+            history_since: optional alias -> ISO timestamp mapping; each
+                entry adds a commit-history totalCount under that alias on
+                the default branch target (e.g. {"last12m": "..."}).
+
+        Returns:
+            Dict mapping (owner, repo) -> node with stargazerCount,
+            pushedAt, languages, issues/pullRequests/releases totalCount,
+            a tag refs totalCount, workflows/scriptsDir tree entries, and
+            a gitlabCi presence marker. Repos whose batch failed are
+            omitted, so callers can fall back to per-repo calls.
+        """
+        results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        branch_ref = "defaultBranchRef { name }"
+        if history_since:
+            histories = " ".join(
+                f'{alias}: history(since: "{ts}") {{ totalCount }}'
+                for alias, ts in history_since.items()
+            )
+            branch_ref = (
+                "defaultBranchRef { name target { ... on Commit { "
+                + histories
+                + " } } }"
+            )
+
+        for start in range(0, len(owner_repos), batch_size):
+            batch = owner_repos[start:start + batch_size]
+            fields = "\n".join(
+                f'r{i}: repository(owner: "{owner}", name: "{name}") {{ '
+                "stargazerCount pushedAt "
+                + branch_ref + " "
+                "languages(first: 20) { edges { size node { name } } } "
+                "issues { totalCount } "
+                "pullRequests { totalCount } "
+                "releases { totalCount } "
+                'tags: refs(refPrefix: "refs/tags/") { totalCount } '
+                'workflows: object(expression: "HEAD:.github/workflows") '
+                "{ ... on Tree { entries { name type } } } "
+                'scriptsDir: object(expression: "HEAD:scripts") '
+                "{ ... on Tree { entries { path type } } } "
+                'gitlabCi: object(expression: "HEAD:.gitlab-ci.yml") '
+                "{ __typename } }"
+                for i, (owner, name) in enumerate(batch)
+            )
+            query = "query {\n" + fields + "\n}"
+            try:
+                data = self.post_graphql(query, {})
+            except requests.HTTPError as e:
+                LOGGER.warning("GraphQL repo metadata batch failed: %s", e)
+                continue
+
+            for i, key in enumerate(batch):
+                node = data.get(f"r{i}")
+                if node:
+                    results[key] = node
+
+        return results
+
     def search_issues_total(self, query: str) -> int:
         data, _ = self.get_json("/search/issues", params={"q": query, "per_page": 1})
         return int(data.get("total_count", 0))
@@ -149,42 +606,11 @@ class GitHubClient:
         max_prs: int = 100,
         since: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        """Fetch merged PRs using GraphQL for efficiency."""
-        query = """
-        query($owner: String!, $repo: String!, $cursor: String) {
-            repository(owner: $owner, name: $repo) {
-                pullRequests(
-                    first: 50,
-                    after: $cursor,
-                    states: [MERGED],
-                    orderBy: {field: UPDATED_AT, direction: DESC}
-                ) {
-                    pageInfo {
-                        hasNextPage
-                        endCursor
-                    }
-                    nodes {
-                        number
-                        title
-                        mergedAt
-                        baseRefOid
-                        mergeCommit {
-                            oid
-                        }
-                        author {
-                            login
-                        }
-                        files(first: 100) {
-                            nodes {
-                                path
-                                additions
-                                deletions
-                            }
-                        }
-                    }
-                }
-            }
-        }
+        """Fetch merged PRs using GraphQL for efficiency.
+
+        Uses the module-level _PR_LIST_QUERY (see its comment for the
+        metadata-only shape); callers fetch file lists lazily via
+        get_pr_files_batch for the PRs that survive their filters.
         """
         prs: List[Dict[str, Any]] = []
         cursor = None
@@ -192,7 +618,7 @@ class GitHubClient:
         while len(prs) < max_prs:
             variables = {"owner": owner, "repo": repo, "cursor": cursor}
             try:
-                data = self.post_graphql(query, variables)
+                data = self.post_graphql(_PR_LIST_QUERY, variables)
             except requests.HTTPError as e:
                 LOGGER.warning("GraphQL error fetching PRs: %s", e)
                 break
@@ -204,12 +630,22 @@ class GitHubClient:
             pr_data = repo_data.get("pullRequests", {})
             nodes = pr_data.get("nodes", [])
 
+            # Inaccessible PRs come back as null slots; drop them in one
+            # page-level pass instead of re-testing inside the hot loop.
+            nodes = [n for n in nodes if n is not None]
+
             for node in nodes:
-                if node is None:
-                    continue
-                merged_at = node.get("mergedAt")
-                if since and merged_at and merged_at < since:
-                    return prs
+                if since:
+                    # updatedAt is the walk's sort key, so it is monotone
+                    # decreasing and serves as the stop signal; mergedAt is
+                    # not monotone under this ordering, so old merges are
+                    # skipped rather than ending the walk (mirrors
+                    # list_merged_prs_rest).
+                    if (node.get("updatedAt") or "") < since:
+                        return prs
+                    merged_at = node.get("mergedAt")
+                    if merged_at and merged_at < since:
+                        continue
                 prs.append(node)
                 if len(prs) >= max_prs:
                     break
@@ -230,65 +666,201 @@ class GitHubClient:
     ) -> Iterable[Dict[str, Any]]:
         """Fetch merged PRs using REST API (fallback)."""
         collected = 0
-        page = 1
-        per_page = 100
-
-        while collected < max_prs:
-            params = {
-                "state": "closed",
-                "sort": "updated",
-                "direction": "desc",
-                "per_page": per_page,
-                "page": page,
-            }
-            data, _ = self.get_json(f"/repos/{owner}/{repo}/pulls", params=params)
+        url = f"{self.base_url}/repos/{owner}/{repo}/pulls"
+        params: Optional[Dict[str, Any]] = {
+            "state": "closed",
+            "sort": "updated",
+            "direction": "desc",
+            "per_page": 100,
+        }
+
+        while collected < max_prs and url:
+            resp = self.request("GET", url, params=params)
+            if resp.status_code >= 400:
+                raise requests.HTTPError(f"{resp.status_code}: {resp.text}")
+            data = _parse_json(resp)
 
             if not data:
                 break
 
             for pr in data:
-                if pr.get("merged_at") is None:
-                    continue
-                if since and pr.get("merged_at") < since:
+                # updated_at is the walk's sort key, so it is monotone
+                # decreasing: once it drops below the cutoff no later page
+                # can hold a newer merge and the walk can stop. merged_at
+                # itself is not monotone here, so old merges are skipped
+                # rather than treated as a stop signal.
+                if since and (pr.get("updated_at") or "") < since:
                     return
+                merged_at = pr.get("merged_at")
+                if merged_at is None:
+                    continue
+                if since and merged_at < since:
+                    continue
                 yield pr
                 collected += 1
                 if collected >= max_prs:
                     break
 
-            if len(data) < per_page:
-                break
-            page += 1
+            # rel="next" URLs already carry the query string
+            url = _next_link(resp.headers)
+            params = None
+
+    def _paginate_concurrent(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        per_page: int = 100,
+        max_items: Optional[int] = None,
+        workers: int = 8,
+    ) -> Iterable[Any]:
+        """
+        Iterate a list-shaped paginated REST collection, overlapping pages.
+
+        Page 1 is fetched synchronously; its Link rel="last" header reveals
+        the final page number, and pages 2..last are downloaded through a
+        bounded thread pool while items are still yielded in page order.
+        """
+        url = f"{self.base_url}{path}"
+        params = dict(params or {})
+        params["per_page"] = per_page
+        params["page"] = 1
+
+        resp = self.request("GET", url, params=params)
+        if resp.status_code >= 400:
+            raise requests.HTTPError(f"{resp.status_code}: {resp.text}")
+        items = _parse_json(resp)
+
+        yielded = 0
+        for item in items:
+            yield item
+            yielded += 1
+            if max_items is not None and yielded >= max_items:
+                return
+
+        if len(items) < per_page:
+            return
+
+        last_page = 1
+        link = resp.headers.get("Link")
+        if link:
+            for entry in requests.utils.parse_header_links(link):
+                if entry.get("rel") == "last":
+                    match = re.search(r"[?&]page=(\d+)", entry.get("url", ""))
+                    if match:
+                        last_page = int(match.group(1))
+        if last_page <= 1:
+            return
+        if max_items is not None:
+            last_page = min(last_page, -(-max_items // per_page))
+
+        def fetch(page: int) -> List[Any]:
+            page_params = dict(params)
+            page_params["page"] = page
+            page_resp = self.request("GET", url, params=page_params)
+            if page_resp.status_code >= 400:
+                raise requests.HTTPError(f"{page_resp.status_code}: {page_resp.text}")
+            return _parse_json(page_resp)
+
+        pages = range(2, last_page + 1)
+        with ThreadPoolExecutor(max_workers=min(workers, len(pages))) as executor:
+            for page_items in executor.map(fetch, pages):
+                for item in page_items:
+                    yield item
+                    yielded += 1
+                    if max_items is not None and yielded >= max_items:
+                        return
+                if not page_items:
+                    return
 
     def get_pr_files(
         self, owner: str, repo: str, pr_number: int
     ) -> List[Dict[str, Any]]:
-        """Get files changed in a PR."""
-        files: List[Dict[str, Any]] = []
-        page = 1
-        per_page = 100
-
-        while True:
-            params = {"per_page": per_page, "page": page}
-            data, _ = self.get_json(
-                f"/repos/{owner}/{repo}/pulls/{pr_number}/files", params=params
+        """Get files changed in a PR (pages fetched concurrently)."""
+        return list(
+            self._paginate_concurrent(
+                f"/repos/{owner}/{repo}/pulls/{pr_number}/files", per_page=100
             )
-            if not data:
-                break
-            files.extend(data)
-            if len(data) < per_page:
+        )
+
+    def get_pr_files_batch(
+        self, owner: str, repo: str, pr_numbers: List[int], batch_size: int = 25
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Fetch changed-file lists for many PRs in few GraphQL round-trips.
+
+        One pullRequest alias per PR (25 per query to stay inside the
+        GraphQL node budget); PRs with more than 100 files are re-queued
+        with their endCursor and drained by follow-up aliased queries.
+
+        Returns:
+            Dict mapping PR number -> REST-shaped file dicts (filename,
+            additions, deletions). GraphQL does not expose patch text, so
+            callers needing unified diffs still use get_pr_files.
+        """
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        pending: List[Tuple[int, Optional[str]]] = [(n, None) for n in pr_numbers]
+
+        while pending:
+            batch = pending[:batch_size]
+            pending = pending[batch_size:]
+            fields = "\n".join(
+                f"pr{i}: pullRequest(number: {number}) {{ files(first: 100"
+                + (f', after: "{cursor}"' if cursor else "")
+                + ") { pageInfo { hasNextPage endCursor } "
+                "nodes { path additions deletions } } }"
+                for i, (number, cursor) in enumerate(batch)
+            )
+            query = (
+                "query($owner: String!, $repo: String!) {\n"
+                "  repository(owner: $owner, name: $repo) {\n"
+                f"{fields}\n"
+                "  }\n"
+                "}"
+            )
+            try:
+                data = self.post_graphql(query, {"owner": owner, "repo": repo})
+            except requests.HTTPError as e:
+                LOGGER.warning("GraphQL PR files batch failed: %s", e)
                 break
-            page += 1
 
-        return files
+            repo_data = data.get("repository") or {}
+            for i, (number, _) in enumerate(batch):
+                node = repo_data.get(f"pr{i}")
+                if not node:
+                    continue
+                files = node.get("files") or {}
+                bucket = results.setdefault(number, [])
+                for f in files.get("nodes", []):
+                    if f:
+                        bucket.append(
+                            {
+                                "filename": f.get("path"),
+                                "additions": f.get("additions", 0),
+                                "deletions": f.get("deletions", 0),
+                            }
+                        )
+                page_info = files.get("pageInfo", {})
+                if page_info.get("hasNextPage"):
+                    pending.append((number, page_info.get("endCursor")))
+
+        return results
 
     def compare_commits(
         self, owner: str, repo: str, base: str, head: str
     ) -> Optional[Dict[str, Any]]:
-        """Compare two commits and get the diff."""
+        """Compare two commits and get the diff (memoized per client)."""
+        # Degenerate compares (single-commit clusters collapse to
+        # base == head after filtering) are answered locally.
+        if base == head:
+            return {"files": [], "ahead_by": 0, "behind_by": 0, "status": "identical"}
+        key = (owner, repo, base, head)
+        if key in self._compare_cache:
+            return self._compare_cache[key]
+
         data, _ = self.get_json_or_none(
             f"/repos/{owner}/{repo}/compare/{base}...{head}"
         )
+        self._compare_cache[key] = data
         return data
 
     def list_commits(
@@ -300,38 +872,76 @@ class GitHubClient:
         until: Optional[str] = None,
         max_commits: int = 100,
     ) -> Iterable[Dict[str, Any]]:
-        """List commits on a repository."""
-        collected = 0
-        page = 1
-        per_page = 100
+        """List commits on a repository (pages fetched concurrently)."""
+        params: Dict[str, Any] = {}
+        if sha:
+            params["sha"] = sha
+        if since:
+            params["since"] = since
+        if until:
+            params["until"] = until
+
+        yield from self._paginate_concurrent(
+            f"/repos/{owner}/{repo}/commits",
+            params=params,
+            per_page=100,
+            max_items=max_commits,
+        )
 
-        while collected < max_commits:
-            params: Dict[str, Any] = {"per_page": per_page, "page": page}
-            if sha:
-                params["sha"] = sha
-            if since:
-                params["since"] = since
-            if until:
-                params["until"] = until
+    def get_commits_batch_graphql(
+        self, owner: str, repo: str, shas: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch metadata for many commits in one GraphQL round-trip.
 
-            data, _ = self.get_json(f"/repos/{owner}/{repo}/commits", params=params)
+        Uses one alias per SHA (up to 100 per query) so N REST calls
+        collapse into ceil(N/100) requests. Only commit metadata is
+        available this way; per-file diffs still require the REST commit
+        endpoint.
 
-            if not data:
+        Returns:
+            Dict mapping SHA -> commit node (oid, message, authoredDate,
+            author name, parent oids). SHAs not found are omitted.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for start in range(0, len(shas), 100):
+            batch = shas[start:start + 100]
+            fields = "\n".join(
+                f'c{i}: object(oid: "{sha}") {{ ... on Commit {{ '
+                "oid message authoredDate "
+                "author { name } parents(first: 3) { nodes { oid } } } }"
+                for i, sha in enumerate(batch)
+            )
+            query = (
+                "query($owner: String!, $repo: String!) {\n"
+                "  repository(owner: $owner, name: $repo) {\n"
+                f"{fields}\n"
+                "  }\n"
+                "}"
+            )
+            try:
+                data = self.post_graphql(query, {"owner": owner, "repo": repo})
+            except requests.HTTPError as e:
+                LOGGER.warning("GraphQL batch commit fetch failed: %s", e)
                 break
 
-            for commit in data:
-                yield commit
-                collected += 1
-                if collected >= max_commits:
-                    break
+            repo_data = data.get("repository") or {}
+            for i, sha in enumerate(batch):
+                node = repo_data.get(f"c{i}")
+                if node:
+                    results[node.get("oid", sha)] = node
 
-            if len(data) < per_page:
-                break
-            page += 1
+        return results
 
     def get_commit(self, owner: str, repo: str, sha: str) -> Optional[Dict[str, Any]]:
-        """Get details of a single commit including files."""
+        """Get details of a single commit including files (memoized: commits
+        are immutable, so repeats skip even the 304 revalidation)."""
+        key = (owner, repo, sha)
+        if key in self._commit_cache:
+            return self._commit_cache[key]
         data, _ = self.get_json_or_none(f"/repos/{owner}/{repo}/commits/{sha}")
+        self._commit_cache[key] = data
         return data
 
     def get_commit_files(
@@ -342,3 +952,25 @@ class GitHubClient:
         if not commit:
             return []
         return commit.get("files", [])
+
+    def get_commit_files_batch(
+        self, owner: str, repo: str, shas: List[str], workers: int = 8
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch changed files for many commits, overlapping the round-trips.
+
+        The GraphQL Commit object does not expose changed-file lists, so
+        this stays on the REST commit endpoint but runs the per-commit
+        requests through a bounded thread pool instead of serially.
+
+        Returns:
+            Dict mapping SHA -> file list (empty list for missing commits).
+        """
+        if not shas:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(shas))) as executor:
+            files = executor.map(
+                lambda sha: self.get_commit_files(owner, repo, sha), shas
+            )
+            return dict(zip(shas, files))
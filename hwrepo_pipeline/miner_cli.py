@@ -118,7 +118,21 @@ def main() -> None:
     if not token:
         logging.warning("GITHUB_TOKEN not set; rate limits will be low")
 
-    client = GitHubClient(token=token)
+    # GITHUB_TOKENS (comma-separated) enables the client's token pool,
+    # multiplying the rate-limit budget across tokens.
+    env_tokens = os.environ.get("GITHUB_TOKENS")
+    token_pool = (
+        [t.strip() for t in env_tokens.split(",") if t.strip()] if env_tokens else None
+    )
+
+    client = GitHubClient(
+        token=token_pool or token,
+        rate_limit_safety=config.rate_limit_safety,
+        cache_path=(
+            os.path.join(config.cache_dir, "hwrepo.sqlite") if config.cache_dir else None
+        ),
+        cache_ttl_days=config.cache_ttl_days,
+    )
 
     # Ensure output directory exists
     output_path = Path(args.output)
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Optional
+from functools import cached_property
+from typing import FrozenSet, List, NamedTuple, Optional
 
 
-@dataclass
-class MatchEvidence:
+class MatchEvidence(NamedTuple):
+    """One allow/deny pattern hit; a NamedTuple because the scanner creates
+    one per regex match in tight loops and tuple instances are immutable,
+    slotted, and roughly half the allocation cost of a dataclass."""
     path: str
     line_number: int
     line: str
@@ -33,12 +36,40 @@ class RepoCard:
     candidate_build_cmds: List[str] = field(default_factory=list)
     candidate_test_cmds: List[str] = field(default_factory=list)
 
+    def to_dict(self) -> dict:
+        """Dict for JSONL output; keeps evidence entries as objects (asdict
+        would leave them as tuples, which json.dumps writes as arrays)."""
+        return {
+            "repo": self.repo,
+            "default_branch": self.default_branch,
+            "stars": self.stars,
+            "pushed_at": self.pushed_at,
+            "sv_ratio": self.sv_ratio,
+            "sv_file_count": self.sv_file_count,
+            "sv_line_count": self.sv_line_count,
+            "has_ci": self.has_ci,
+            "ci_files": self.ci_files,
+            "commit_count_last_12m": self.commit_count_last_12m,
+            "commit_count_last_6m": self.commit_count_last_6m,
+            "pr_total": self.pr_total,
+            "issue_total": self.issue_total,
+            "has_release_or_tags": self.has_release_or_tags,
+            "open_eda_evidence": [e._asdict() for e in self.open_eda_evidence],
+            "deny_evidence": [e._asdict() for e in self.deny_evidence],
+            "candidate_build_cmds": self.candidate_build_cmds,
+            "candidate_test_cmds": self.candidate_test_cmds,
+        }
+
 
 @dataclass
 class RejectRecord:
     repo: str
     reasons: List[str]
 
+    def to_dict(self) -> dict:
+        """Flat dict for JSONL output; avoids asdict's recursive copy."""
+        return {"repo": self.repo, "reasons": self.reasons}
+
 
 # --- Commit Miner Models ---
 
@@ -52,6 +83,16 @@ class FilePatch:
     deletions: int
     patch: Optional[str] = None  # unified diff content
 
+    def to_dict(self) -> dict:
+        """Flat dict for JSONL output; avoids asdict's recursive copy."""
+        return {
+            "path": self.path,
+            "patch_type": self.patch_type,
+            "additions": self.additions,
+            "deletions": self.deletions,
+            "patch": self.patch,
+        }
+
 
 @dataclass
 class CommitPair:
@@ -65,6 +106,19 @@ class CommitPair:
     test_patches: List[FilePatch] = field(default_factory=list)
     validation_status: str = "pending"  # "pending" | "valid" | "invalid"
 
+    def to_dict(self) -> dict:
+        """Dict for JSONL output; avoids asdict's recursive copy."""
+        return {
+            "repo": self.repo,
+            "base_sha": self.base_sha,
+            "target_sha": self.target_sha,
+            "source_type": self.source_type,
+            "source_id": self.source_id,
+            "code_patches": [p.to_dict() for p in self.code_patches],
+            "test_patches": [p.to_dict() for p in self.test_patches],
+            "validation_status": self.validation_status,
+        }
+
 
 @dataclass
 class PRInfo:
@@ -88,6 +142,11 @@ class CommitInfo:
     parents: List[str] = field(default_factory=list)
     files: List[FilePatch] = field(default_factory=list)
 
+    @cached_property
+    def path_set(self) -> FrozenSet[str]:
+        """Touched file paths, built once and cached for overlap checks."""
+        return frozenset(f.path for f in self.files)
+
 
 @dataclass
 class CommitCluster:
@@ -108,6 +167,15 @@ class MinerRejectRecord:
     source_id: str
     reasons: List[str]
 
+    def to_dict(self) -> dict:
+        """Dict for JSONL output; avoids asdict's recursive copy."""
+        return {
+            "repo": self.repo,
+            "source_type": self.source_type,
+            "source_id": self.source_id,
+            "reasons": self.reasons,
+        }
+
 
 @dataclass
 class AuthorContribution:
@@ -127,3 +195,18 @@ class AuthorContribution:
     test_patches: List[FilePatch] = field(default_factory=list)
     commit_messages: List[str] = field(default_factory=list)
     validation_status: str = "pending"  # "pending" | "valid" | "invalid"
+
+    def to_dict(self) -> dict:
+        """Dict for JSONL output; avoids asdict's recursive copy."""
+        return {
+            "repo": self.repo,
+            "author": self.author,
+            "contribution_id": self.contribution_id,
+            "commits": self.commits,
+            "first_commit_date": self.first_commit_date,
+            "last_commit_date": self.last_commit_date,
+            "code_patches": [p.to_dict() for p in self.code_patches],
+            "test_patches": [p.to_dict() for p in self.test_patches],
+            "commit_messages": self.commit_messages,
+            "validation_status": self.validation_status,
+        }
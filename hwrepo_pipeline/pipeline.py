@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import json
 import logging
-from dataclasses import asdict
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
@@ -10,7 +11,7 @@ from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from .config import PipelineConfig
 from .github_client import GitHubClient
 from .models import MatchEvidence, RejectRecord, RepoCard
-from .scanner import compile_allowlist, compile_denylist, extract_candidate_cmds, scan_text
+from .scanner import extract_candidate_cmds, scan_text
 
 LOGGER = logging.getLogger(__name__)
 
@@ -24,34 +25,38 @@ def _within_days(pushed_at: str, days: int) -> bool:
     return _parse_dt(pushed_at) >= cutoff
 
 
+# rel="last" page number out of a Link header in one compiled scan
+_LINK_LAST_RE = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+
 def _estimate_total_from_link(link_header: Optional[str], per_page: int) -> Optional[int]:
     if not link_header:
         return None
-    for part in link_header.split(","):
-        if 'rel="last"' in part:
-            start = part.find("page=")
-            if start == -1:
-                return None
-            page_str = part[start + 5 :].split(">", 1)[0]
-            try:
-                last_page = int(page_str)
-                return last_page * per_page
-            except ValueError:
-                return None
-    return None
+    m = _LINK_LAST_RE.search(link_header)
+    return int(m.group(1)) * per_page if m else None
 
 
 def discover_candidates(client: GitHubClient, config: PipelineConfig) -> List[Dict[str, Any]]:
     repos: Dict[str, Dict[str, Any]] = {}
-    for language in config.search_languages:
+    if not config.search_languages:
+        return []
+
+    def search(language: str) -> List[Dict[str, Any]]:
         query = f"language:{language} {config.search_qualifiers} stars:>={config.min_stars}"
-        for item in client.search_repositories(
+        return list(client.search_repositories(
             query=query,
             sort=config.search_sort,
             order=config.search_order,
             max_results=config.max_repos_per_language,
-        ):
-            repos[item["full_name"]] = item
+        ))
+
+    # Each language search paginates independently, so run them in
+    # parallel; executor.map keeps the merge in config order, preserving
+    # the old dedup precedence by full_name.
+    with ThreadPoolExecutor(max_workers=len(config.search_languages)) as executor:
+        for items in executor.map(search, config.search_languages):
+            for item in items:
+                repos[item["full_name"]] = item
     return list(repos.values())
 
 
@@ -63,15 +68,15 @@ def _language_ratio(languages: Dict[str, int]) -> float:
     return verilog / total
 
 
-def _count_sv_files(tree: Iterable[Dict[str, Any]], extensions: List[str]) -> int:
-    count = 0
-    for item in tree:
-        if item.get("type") != "blob":
-            continue
-        path = item.get("path", "")
-        if any(path.endswith(ext) for ext in extensions):
-            count += 1
-    return count
+def _sv_blob_paths(tree: Iterable[Dict[str, Any]], suffixes: Tuple[str, ...]) -> List[str]:
+    """Paths of Verilog/SV blobs in one tree walk; the caller's file count
+    is the list length, so the line-count branch reuses the same pass."""
+    return [
+        item.get("path", "")
+        for item in tree
+        # endswith on a tuple checks all suffixes in one C call
+        if item.get("type") == "blob" and item.get("path", "").endswith(suffixes)
+    ]
 
 
 def _count_sv_lines(
@@ -84,17 +89,50 @@ def _count_sv_lines(
 ) -> int:
     total = 0
     for path in paths:
-        text = client.get_file_text(owner, repo, path, ref=ref)
-        if text is None:
-            continue
-        total += len(text.splitlines())
-        if total >= min_lines:
-            break
+        # Count newlines chunk by chunk; closing the stream once the
+        # threshold is met aborts the transfer, so multi-MB generated
+        # files are never fully downloaded or held in memory.
+        stream = client.iter_file_bytes(owner, repo, path, ref=ref)
+        tail_newline = True
+        for chunk in stream:
+            if not chunk:
+                continue
+            total += chunk.count(b"\n")
+            tail_newline = chunk.endswith(b"\n")
+            if total >= min_lines:
+                stream.close()
+                return total
+        if not tail_newline:
+            # Final line without a trailing newline still counts
+            total += 1
+            if total >= min_lines:
+                return total
     return total
 
 
-def _get_ci_files(client: GitHubClient, owner: str, repo: str) -> Tuple[bool, List[str]]:
-    ci_files: List[str] = []
+def _get_ci_files(
+    client: GitHubClient,
+    owner: str,
+    repo: str,
+    meta: Optional[Dict[str, Any]] = None,
+) -> Tuple[bool, List[str]]:
+    # The batched metadata node answers this without any REST round-trip:
+    # workflows is the .github/workflows tree (None when absent) and
+    # gitlabCi marks .gitlab-ci.yml presence.
+    if meta and "workflows" in meta:
+        ci_files = [
+            entry.get("name", "")
+            for entry in (meta.get("workflows") or {}).get("entries") or []
+            if entry.get("type") == "blob"
+        ]
+        if ci_files:
+            return True, ci_files
+        if "gitlabCi" in meta:
+            if meta.get("gitlabCi"):
+                return True, [".gitlab-ci.yml"]
+            return False, []
+
+    ci_files = []
     data = client.list_contents(owner, repo, ".github/workflows")
     if isinstance(data, list):
         for item in data:
@@ -116,24 +154,42 @@ def _collect_scan_paths(
     repo: str,
     config: PipelineConfig,
     ci_files: List[str],
+    meta: Optional[Dict[str, Any]] = None,
 ) -> List[str]:
-    paths: Set[str] = set(config.scan_paths)
+    # Insertion-ordered dedup: the config order, then workflows, then
+    # scripts. That is already deterministic, so no final sort is needed.
+    paths: List[str] = []
+    seen: Set[str] = set()
+
+    def add(path: str) -> None:
+        if path and path not in seen:
+            seen.add(path)
+            paths.append(path)
+
+    for path in config.scan_paths:
+        add(path)
 
     if config.scan_workflows and ci_files:
         for name in ci_files:
             if name == ".gitlab-ci.yml":
-                paths.add(name)
+                add(name)
             else:
-                paths.add(f".github/workflows/{name}")
+                add(f".github/workflows/{name}")
 
     if config.scan_scripts_dir:
-        data = client.list_contents(owner, repo, "scripts")
-        if isinstance(data, list):
-            for item in data[: config.max_script_files]:
-                if item.get("type") == "file":
-                    paths.add(item.get("path", ""))
+        if meta and "scriptsDir" in meta:
+            entries = (meta.get("scriptsDir") or {}).get("entries") or []
+            for item in entries[: config.max_script_files]:
+                if item.get("type") == "blob":
+                    add(item.get("path", ""))
+        else:
+            data = client.list_contents(owner, repo, "scripts")
+            if isinstance(data, list):
+                for item in data[: config.max_script_files]:
+                    if item.get("type") == "file":
+                        add(item.get("path", ""))
 
-    return sorted(p for p in paths if p)
+    return paths
 
 
 def _scan_repo_for_tools(
@@ -143,6 +199,7 @@ def _scan_repo_for_tools(
     paths: Iterable[str],
     allow_re,
     deny_re,
+    max_bytes: int = 0,
 ) -> Tuple[List[MatchEvidence], List[MatchEvidence], List[str], List[str]]:
     allow_hits: List[MatchEvidence] = []
     deny_hits: List[MatchEvidence] = []
@@ -153,6 +210,10 @@ def _scan_repo_for_tools(
         text = client.get_file_text(owner, repo, path)
         if text is None:
             continue
+        if max_bytes and len(text) > max_bytes:
+            # Truncate pathological manifests; evidence this deep in a
+            # file is not worth holding megabytes for.
+            text = text[:max_bytes]
         allow, deny = scan_text(path, text, allow_re, deny_re)
         allow_hits.extend(allow)
         deny_hits.extend(deny)
@@ -239,13 +300,23 @@ def _commit_count(
 
 
 def evaluate_repo(
-    client: GitHubClient, item: Dict[str, Any], config: PipelineConfig
+    client: GitHubClient,
+    item: Dict[str, Any],
+    config: PipelineConfig,
+    meta: Optional[Dict[str, Any]] = None,
 ) -> Tuple[Optional[RepoCard], Optional[RejectRecord]]:
+    """Evaluate a candidate repo against the configured filters.
+
+    ``meta`` is an optional node from GitHubClient.batch_repo_metadata;
+    when present, the per-repo PR/issue/release/tag probes are answered
+    from it instead of issuing REST calls.
+    """
     full_name = item["full_name"]
     owner = item["owner"]["login"]
     repo = item["name"]
     default_branch = item.get("default_branch", "")
     reasons: List[str] = []
+    meta = meta or {}
 
     if item.get("archived") or item.get("fork"):
         reasons.append("archived_or_fork")
@@ -257,11 +328,24 @@ def evaluate_repo(
     if not pushed_at or not _within_days(pushed_at, config.pushed_within_days):
         reasons.append("pushed_at")
 
-    try:
-        languages = client.get_languages(owner, repo)
-    except Exception:
-        reasons.append("languages_api")
-        languages = None
+    # Stage gate: the checks so far cost nothing beyond the search payload
+    # and disqualify most candidates, so skip the API-backed stages for
+    # them. Rejects then record only the first failing stage.
+    if reasons and config.fast_reject:
+        return None, RejectRecord(repo=full_name, reasons=sorted(set(reasons)))
+
+    if "languages" in meta:
+        languages = {
+            edge["node"]["name"]: int(edge.get("size", 0))
+            for edge in (meta.get("languages") or {}).get("edges") or []
+            if edge and edge.get("node")
+        }
+    else:
+        try:
+            languages = client.get_languages(owner, repo)
+        except Exception:
+            reasons.append("languages_api")
+            languages = None
 
     sv_ratio = _language_ratio(languages) if languages else 0.0
     if languages and sv_ratio < config.min_sv_ratio:
@@ -276,17 +360,12 @@ def evaluate_repo(
         reasons.append("tree_api")
 
     if tree is not None:
-        sv_file_count = _count_sv_files(tree, config.verilog_extensions)
+        sv_paths = _sv_blob_paths(tree, config.verilog_suffixes)
+        sv_file_count = len(sv_paths)
         file_pass = config.min_sv_files == 0 or sv_file_count >= config.min_sv_files
 
         line_pass = True
         if config.min_sv_lines and not file_pass:
-            sv_paths = [
-                entry.get("path", "")
-                for entry in tree
-                if entry.get("type") == "blob"
-                and any(entry.get("path", "").endswith(ext) for ext in config.verilog_extensions)
-            ]
             sv_line_count = _count_sv_lines(
                 client,
                 owner,
@@ -303,12 +382,16 @@ def evaluate_repo(
         if "tree_api" not in reasons:
             reasons.append("tree_api")
 
-    has_ci, ci_files = _get_ci_files(client, owner, repo)
-    scan_paths = _collect_scan_paths(client, owner, repo, config, ci_files)
-    allow_re = compile_allowlist(config.allowlist_terms)
-    deny_re = compile_denylist(config.denylist_terms)
+    # Stage gate before the file-content stage (CI listing plus one text
+    # fetch and scan per path), the most expensive part of evaluation.
+    if reasons and config.fast_reject:
+        return None, RejectRecord(repo=full_name, reasons=sorted(set(reasons)))
+
+    has_ci, ci_files = _get_ci_files(client, owner, repo, meta)
+    scan_paths = _collect_scan_paths(client, owner, repo, config, ci_files, meta)
     allow_hits, deny_hits, build_cmds, test_cmds = _scan_repo_for_tools(
-        client, owner, repo, scan_paths, allow_re, deny_re
+        client, owner, repo, scan_paths, config.allowlist_re, config.denylist_re,
+        max_bytes=config.max_scan_bytes,
     )
 
     if deny_hits:
@@ -318,43 +401,48 @@ def evaluate_repo(
         reasons.append("allowlist_missing")
 
     pr_total = 0
-    if config.min_pr_total:
+    if "pullRequests" in meta:
+        pr_total = int(meta["pullRequests"].get("totalCount", 0))
+        if config.min_pr_total and pr_total < config.min_pr_total:
+            reasons.append("pr_total")
+    elif config.min_pr_total:
+        # Only spend a search call when a threshold actually gates on it;
+        # with min_pr_total == 0 the count is informational and stays 0.
         try:
             pr_total = client.search_issues_total(f"repo:{full_name} is:pr")
             if pr_total < config.min_pr_total:
                 reasons.append("pr_total")
         except Exception:
             reasons.append("pr_total_api")
-    else:
-        try:
-            pr_total = client.search_issues_total(f"repo:{full_name} is:pr")
-        except Exception:
-            pr_total = 0
 
     issue_total = 0
-    if config.min_issue_total:
+    if "issues" in meta:
+        issue_total = int(meta["issues"].get("totalCount", 0))
+        if config.min_issue_total and issue_total < config.min_issue_total:
+            reasons.append("issue_total")
+    elif config.min_issue_total:
         try:
             issue_total = client.search_issues_total(f"repo:{full_name} is:issue")
             if issue_total < config.min_issue_total:
                 reasons.append("issue_total")
         except Exception:
             reasons.append("issue_total_api")
-    else:
-        try:
-            issue_total = client.search_issues_total(f"repo:{full_name} is:issue")
-        except Exception:
-            issue_total = 0
 
     commit_12m = None
     commit_6m = None
     if config.min_commit_last_12m or config.min_commit_last_6m:
-        now = datetime.now(timezone.utc)
-        commit_12m = _commit_count(
-            client, owner, repo, now - timedelta(days=365), config.use_graphql
-        )
-        commit_6m = _commit_count(
-            client, owner, repo, now - timedelta(days=182), config.use_graphql
-        )
+        target = (meta.get("defaultBranchRef") or {}).get("target") or {}
+        if "last12m" in target and "last6m" in target:
+            commit_12m = int((target["last12m"] or {}).get("totalCount", 0))
+            commit_6m = int((target["last6m"] or {}).get("totalCount", 0))
+        else:
+            now = datetime.now(timezone.utc)
+            commit_12m = _commit_count(
+                client, owner, repo, now - timedelta(days=365), config.use_graphql
+            )
+            commit_6m = _commit_count(
+                client, owner, repo, now - timedelta(days=182), config.use_graphql
+            )
         if commit_12m is None or commit_6m is None:
             reasons.append("commit_count")
         elif (
@@ -364,7 +452,16 @@ def evaluate_repo(
             reasons.append("commit_activity")
 
     has_release_or_tags = True
-    if config.min_releases or config.min_tags:
+    if (config.min_releases or config.min_tags) and "releases" in meta and "tags" in meta:
+        release_count = int(meta["releases"].get("totalCount", 0))
+        tags_count = int(meta["tags"].get("totalCount", 0))
+        has_release = (
+            release_count >= config.min_releases if config.min_releases else False
+        )
+        has_release_or_tags = has_release or tags_count >= config.min_tags
+        if not has_release_or_tags:
+            reasons.append("release_or_tags")
+    elif config.min_releases or config.min_tags:
         try:
             releases, _ = client.get_releases(owner, repo, per_page=1)
             has_release = (
@@ -402,8 +499,10 @@ def evaluate_repo(
         has_release_or_tags=has_release_or_tags,
         open_eda_evidence=allow_hits,
         deny_evidence=deny_hits,
-        candidate_build_cmds=sorted(set(build_cmds)),
-        candidate_test_cmds=sorted(set(test_cmds)),
+        # dict.fromkeys dedups in O(n) while keeping scan order, which is
+        # already deterministic -- no sort needed
+        candidate_build_cmds=list(dict.fromkeys(build_cmds)),
+        candidate_test_cmds=list(dict.fromkeys(test_cmds)),
     )
     return card, None
 
@@ -417,14 +516,49 @@ def run_pipeline(
     output_path.parent.mkdir(parents=True, exist_ok=True)
     reject_path.parent.mkdir(parents=True, exist_ok=True)
 
+    candidates = discover_candidates(client, config)
+
+    # One aliased GraphQL query per ~50 repos answers the languages,
+    # PR/issue/release/tag, CI/scripts-listing, and commit-activity probes
+    # up front; repos missing from the result fall back to the per-repo
+    # REST calls inside evaluate_repo.
+    metadata: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    if config.use_graphql and candidates:
+        history_since = None
+        if config.min_commit_last_12m or config.min_commit_last_6m:
+            now = datetime.now(timezone.utc)
+            history_since = {
+                "last12m": (now - timedelta(days=365)).isoformat(),
+                "last6m": (now - timedelta(days=182)).isoformat(),
+            }
+        try:
+            metadata = client.batch_repo_metadata(
+                [(item["owner"]["login"], item["name"]) for item in candidates],
+                history_since=history_since,
+            )
+        except Exception:
+            LOGGER.exception("Batched repo metadata prefetch failed")
+
+    # Per-repo evaluation is dominated by independent GitHub round-trips,
+    # so overlap repos with a bounded thread pool and serialize only the
+    # JSONL writes in the main thread via as_completed; no per-line flush,
+    # the files close (and drain) when the with-block exits.
     with output_path.open("w", encoding="utf-8") as out_f, reject_path.open(
         "w", encoding="utf-8"
-    ) as rej_f:
-        for item in discover_candidates(client, config):
-            card, reject = evaluate_repo(client, item, config)
+    ) as rej_f, ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+        futures = [
+            executor.submit(
+                evaluate_repo,
+                client,
+                item,
+                config,
+                metadata.get((item["owner"]["login"], item["name"])),
+            )
+            for item in candidates
+        ]
+        for future in as_completed(futures):
+            card, reject = future.result()
             if card:
-                out_f.write(json.dumps(asdict(card), ensure_ascii=False) + "\n")
-                out_f.flush()
+                out_f.write(json.dumps(card.to_dict(), ensure_ascii=False) + "\n")
             elif reject:
-                rej_f.write(json.dumps(asdict(reject), ensure_ascii=False) + "\n")
-                rej_f.flush()
+                rej_f.write(json.dumps(reject.to_dict(), ensure_ascii=False) + "\n")
@@ -1,37 +1,68 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Iterable, List, Tuple
 
 from .models import MatchEvidence
 
-
-def compile_allowlist(terms: Iterable[str]) -> re.Pattern:
+# Fixed helper patterns, compiled at import time instead of per line
+_VCS_RE = re.compile(r"\bvcs\b")
+# One alternation covering every real-usage signal in a single pass:
+# vlogan (the VCS analyzer binary) alone suffices; the co-occurrence
+# checks (synopsys+vcs, vcs+-full64) accept either order, matching the
+# old pairs of substring probes.
+_VCS_TOOL_RE = re.compile(
+    r"vlogan"
+    r"|synopsys.*vcs|vcs.*synopsys"
+    r"|\bvcs\b\s+[-+]"
+    r"|vcs.*-full64|-full64.*vcs"
+)
+_VCS_FALSE_POSITIVE_RE = re.compile(r"version[ -]control")
+_TEST_CMD_RE = re.compile(r"\btest\b|\bcheck\b|pytest")
+# Anchored MULTILINE patterns so extract_candidate_cmds walks a file in
+# one finditer pass instead of materializing a line list. The non-greedy
+# prefix splits at the first "run:" on a line, like the old split did.
+_MAKE_TARGET_RE = re.compile(r"^(test|check|build|all)\s*:\s*", re.MULTILINE)
+_YAML_RUN_RE = re.compile(r"^.*?run:(.*)$", re.MULTILINE)
+
+
+@lru_cache(maxsize=32)
+def _compile_terms(terms: Tuple[str, ...]) -> re.Pattern:
+    # Memoized on the term tuple: the allow/deny lists are fixed per run,
+    # so the per-repo compile calls collapse to a cache hit.
     escaped = [re.escape(term) for term in terms]
     pattern = r"\b(" + "|".join(escaped) + r")\b"
     return re.compile(pattern, re.IGNORECASE)
 
 
+def compile_allowlist(terms: Iterable[str]) -> re.Pattern:
+    return _compile_terms(tuple(terms))
+
+
 def compile_denylist(terms: Iterable[str]) -> re.Pattern:
-    escaped = [re.escape(term) for term in terms]
-    pattern = r"\b(" + "|".join(escaped) + r")\b"
-    return re.compile(pattern, re.IGNORECASE)
+    return _compile_terms(tuple(terms))
 
 
 def _is_false_positive_vcs(line_lower: str) -> bool:
-    if "version control" in line_lower or "version-control" in line_lower:
-        return True
-    return False
+    return _VCS_FALSE_POSITIVE_RE.search(line_lower) is not None
 
 
 def _is_vcs_tool_usage(line_lower: str) -> bool:
-    if "synopsys" in line_lower and "vcs" in line_lower:
-        return True
-    if re.search(r"\bvcs\b\s+[-+]", line_lower):
-        return True
-    if "vlogan" in line_lower or "vcs" in line_lower and "-full64" in line_lower:
-        return True
-    return False
+    return _VCS_TOOL_RE.search(line_lower) is not None
+
+
+_NEWLINE_RE = re.compile(r"\n")
+
+
+@lru_cache(maxsize=32)
+def _fuse_patterns(allow_pattern: str, deny_pattern: str) -> re.Pattern:
+    """Combine the allow and deny alternations into one pattern so a file
+    is scanned in a single C-level pass; m.lastgroup tells which side hit."""
+    return re.compile(
+        rf"(?P<allow>{allow_pattern})|(?P<deny>{deny_pattern})", re.IGNORECASE
+    )
 
 
 def scan_text(
@@ -43,20 +74,44 @@ def scan_text(
     allow_hits: List[MatchEvidence] = []
     deny_hits: List[MatchEvidence] = []
 
-    for idx, line in enumerate(content.splitlines(), start=1):
-        if allow_re.search(line):
+    combined = _fuse_patterns(allow_re.pattern, deny_re.pattern)
+    # Newline offsets computed once per file: bisecting them turns a match
+    # offset into a 1-based line number, and the surrounding line is sliced
+    # only for matches, so the buffer is never split into a line list.
+    newlines = [m.start() for m in _NEWLINE_RE.finditer(content)]
+    size = len(content)
+
+    # As before, each line yields at most one evidence record per list and
+    # the deny false-positive decision is made once per line.
+    last_allow_line = 0
+    last_deny_line = 0
+
+    for m in combined.finditer(content):
+        idx = bisect_right(newlines, m.start())
+        line_no = idx + 1
+        is_allow = m.lastgroup == "allow"
+        if line_no == (last_allow_line if is_allow else last_deny_line):
+            continue
+
+        line_start = newlines[idx - 1] + 1 if idx else 0
+        line_end = newlines[idx] if idx < len(newlines) else size
+        line = content[line_start:line_end]
+
+        if is_allow:
+            last_allow_line = line_no
             allow_hits.append(
-                MatchEvidence(path=path, line_number=idx, line=line.strip(), pattern=allow_re.pattern)
+                MatchEvidence(path=path, line_number=line_no, line=line.strip(), pattern=allow_re.pattern)
             )
-        if deny_re.search(line):
+        else:
+            last_deny_line = line_no
             line_lower = line.lower()
-            if re.search(r"\bvcs\b", line_lower):
+            if _VCS_RE.search(line_lower):
                 if _is_false_positive_vcs(line_lower):
                     continue
                 if not _is_vcs_tool_usage(line_lower):
                     continue
             deny_hits.append(
-                MatchEvidence(path=path, line_number=idx, line=line.strip(), pattern=deny_re.pattern)
+                MatchEvidence(path=path, line_number=line_no, line=line.strip(), pattern=deny_re.pattern)
             )
     return allow_hits, deny_hits
 
@@ -66,27 +121,22 @@ def extract_candidate_cmds(path: str, content: str) -> Tuple[List[str], List[str
     test_cmds: List[str] = []
 
     if path.lower().endswith((".yml", ".yaml")):
-        for line in content.splitlines():
-            if "run:" in line:
-                _, cmd = line.split("run:", 1)
-                cmd = cmd.strip()
-                if cmd in {"|", ">"}:
-                    continue
-                if cmd:
-                    if re.search(r"\btest\b|\bcheck\b|pytest", cmd):
-                        test_cmds.append(cmd)
-                    else:
-                        build_cmds.append(cmd)
+        for match in _YAML_RUN_RE.finditer(content):
+            cmd = match.group(1).strip()
+            if not cmd or cmd in {"|", ">"}:
+                continue
+            if _TEST_CMD_RE.search(cmd):
+                test_cmds.append(cmd)
+            else:
+                build_cmds.append(cmd)
 
     if path.endswith("Makefile"):
-        for line in content.splitlines():
-            match = re.match(r"^(test|check|build|all)\s*:\s*", line)
-            if match:
-                target = match.group(1)
-                cmd = f"make {target}"
-                if target in {"test", "check"}:
-                    test_cmds.append(cmd)
-                else:
-                    build_cmds.append(cmd)
+        for match in _MAKE_TARGET_RE.finditer(content):
+            target = match.group(1)
+            cmd = f"make {target}"
+            if target in {"test", "check"}:
+                test_cmds.append(cmd)
+            else:
+                build_cmds.append(cmd)
 
     return build_cmds, test_cmds